@@ -2,68 +2,303 @@ import sys
 import argparse
 import json
 import logging
-from services.compression_service import CompressionService
+from typing import List, Optional
+from services.compression_service import CompressionService, REJECTED_POLICIES
 from services.decompression_service import DecompressionService
+from services.compression_pipeline import CompressionPipeline
+from services import llm_service
+from services.llm_provider import RouterProvider
+from data_access.airtable_client import get_shared_client
+from data_access.record_index import LinkedRecordIndex
+from config.airtable_config import RECORD_INDEX_PATH, MAX_WORKERS, DECOMPRESS_PROCESSES
+from config.llm_config import LLM_CONCURRENCY, LLM_BATCH_SIZE, REJECTED_LLM_POLICY
+from config.telemetry_config import METRICS_FORMAT, METRICS_FILE
 from models.screening_result import ScreeningResult
+from telemetry.metrics import EXPORT_FORMATS, get_metrics
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+
+def env_default(parser: argparse.ArgumentParser, name: str, value: str, choices) -> str:
+    """Check a default taken from the environment, which argparse does not validate against ``choices``"""
+    if value and value not in choices:
+        parser.error(f"{name}={value!r} is not valid. Choose from: {', '.join(choices)}")
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser"""
+    parser = argparse.ArgumentParser(description="Compress and decompress applicant data in Airtable")
+    subparsers = parser.add_subparsers(dest="command")
+
+    compress_parser = subparsers.add_parser("compress", help="Compress one applicant, or every ID in --ids-file")
+    compress_parser.add_argument("applicant_id", nargs="?", help="ApplicantId to compress")
+    compress_parser.add_argument("--ids-file", help="File with one ApplicantId per line")
+
+    compress_all_parser = subparsers.add_parser("compress-all", help="Compress every applicant in Personal Details")
+    compress_changed_parser = subparsers.add_parser(
+        "compress-changed", help="Compress only applicants whose source rows changed since their last compression"
+    )
+
+    for bulk_parser in (compress_parser, compress_all_parser, compress_changed_parser):
+        bulk_parser.add_argument("--airtable-concurrency", type=int, default=MAX_WORKERS,
+                                 help="Airtable reads/writes in flight during bulk runs")
+        bulk_parser.add_argument("--llm-concurrency", type=int, default=LLM_CONCURRENCY,
+                                 help="Gemini calls in flight during bulk runs")
+        bulk_parser.add_argument("--llm-batch-size", type=int, default=LLM_BATCH_SIZE,
+                                 help="Applicants packed into one Gemini prompt during bulk runs")
+        bulk_parser.add_argument("--sequential", action="store_true",
+                                 help="Process bulk runs one applicant at a time instead of pipelining")
+    rejected_policy = env_default(parser, "REJECTED_LLM_POLICY", REJECTED_LLM_POLICY, REJECTED_POLICIES)
+    for llm_parser in (compress_parser, compress_all_parser, compress_changed_parser):
+        llm_parser.add_argument("--no-llm-cache", action="store_true",
+                                help="Always call Gemini instead of reusing cached analyses")
+        llm_parser.add_argument("--rejected-policy", choices=REJECTED_POLICIES, default=rejected_policy,
+                                help="LLM handling for applicants the screening rules reject")
+
+    decompress_parser = subparsers.add_parser("decompress", help="Decompress one applicant, or every ID in --ids-file")
+    decompress_parser.add_argument("applicant_id", nargs="?", help="ApplicantId to decompress")
+    decompress_parser.add_argument("--ids-file", help="File with one ApplicantId per line")
+    decompress_all_parser = subparsers.add_parser("decompress-all", help="Decompress every applicant in Applicants")
+    for bulk_parser in (decompress_parser, decompress_all_parser):
+        bulk_parser.add_argument("--airtable-concurrency", type=int, default=MAX_WORKERS,
+                                 help="Applicants written at once during bulk runs")
+        bulk_parser.add_argument("--processes", type=int, default=DECOMPRESS_PROCESSES,
+                                 help="Worker processes decoding Compressed JSON during bulk runs (0: one per CPU)")
+
+    index_parser = subparsers.add_parser("rebuild-index", help="Rebuild the local record index from full table scans")
+    index_parser.add_argument("--path", default=RECORD_INDEX_PATH,
+                              help="SQLite file for the index (defaults to AIRTABLE_RECORD_INDEX)")
+
+    metrics_format = env_default(parser, "METRICS_FORMAT", METRICS_FORMAT, EXPORT_FORMATS)
+    for command_parser in subparsers.choices.values():
+        command_parser.add_argument("--metrics", choices=EXPORT_FORMATS, default=metrics_format or None,
+                                    help="Write a timing and request-count summary of the run in this format")
+        command_parser.add_argument("--metrics-file", default=METRICS_FILE or None,
+                                    help="File for the --metrics summary (logged when omitted)")
+
+    return parser
+
+
 def main():
     """Main application entry point"""
-    if len(sys.argv) < 3:
-        logger.error("Usage: python main.py [compress|decompress] <applicant_id>")
-        sys.exit(1)
-    
-    command = sys.argv[1]
-    applicant_id = sys.argv[2]
-    
-    logger.info(f"Executing {command} command for applicant ID: {applicant_id}")
-    
-    if command == "compress":
-        compress_applicant(applicant_id)
-    elif command == "decompress":
-        decompress_applicant(applicant_id)
+    parser = build_parser()
+    args = parser.parse_args()
+
+    if getattr(args, "no_llm_cache", False):
+        llm_service.set_cache_enabled(False)
+
+    try:
+        run_command(args)
+    finally:
+        # Also written when a command fails and exits, when the timings matter most
+        if getattr(args, "metrics", None):
+            report_metrics(args.metrics, args.metrics_file)
+
+
+def run_command(args: argparse.Namespace):
+    """Dispatch the parsed command"""
+    if args.command == "compress":
+        if args.ids_file:
+            compress_applicants(read_ids_file(args.ids_file), args)
+        elif args.applicant_id:
+            logger.info(f"Executing compress command for applicant ID: {args.applicant_id}")
+            compress_applicant(args.applicant_id, args.rejected_policy)
+        else:
+            logger.error("Usage: python main.py compress <applicant_id> | --ids-file <path>")
+            sys.exit(1)
+    elif args.command == "compress-all":
+        compress_applicants(None, args)
+    elif args.command == "compress-changed":
+        compress_applicants(None, args, changed_only=True)
+    elif args.command == "decompress":
+        if args.ids_file:
+            decompress_applicants(read_ids_file(args.ids_file), args)
+        elif args.applicant_id:
+            logger.info(f"Executing decompress command for applicant ID: {args.applicant_id}")
+            decompress_applicant(args.applicant_id)
+        else:
+            logger.error("Usage: python main.py decompress <applicant_id> | --ids-file <path>")
+            sys.exit(1)
+    elif args.command == "decompress-all":
+        decompress_applicants(None, args)
+    elif args.command == "rebuild-index":
+        rebuild_index(args.path)
     else:
-        logger.error("Invalid command. Use 'compress' or 'decompress'")
+        logger.error("Usage: python main.py [compress|compress-all|compress-changed|decompress|decompress-all|rebuild-index] <applicant_id>")
         sys.exit(1)
 
 
-def compress_applicant(applicant_id: str):
+def report_metrics(fmt: str, path: Optional[str]):
+    """Write the run's metrics summary to ``path``, or log it"""
+    summary = get_metrics().export(fmt)
+    if path:
+        with open(path, "w") as f:
+            f.write(summary)
+        logger.info(f"Wrote {fmt} metrics to {path}")
+    else:
+        logger.info(f"Run metrics ({fmt}):\n{summary}")
+
+
+def log_request_stats():
+    """Log how many Airtable requests were sent, queued by the rate limiter, throttled and retried"""
+    stats = get_shared_client().stats.snapshot()
+    logger.info(f"Airtable requests: {stats['requests']} sent | {stats['queued']} queued "
+                f"({stats['wait_seconds']:.1f}s waiting) | {stats['throttled']} throttled (429) | "
+                f"{stats['retried']} retried | {stats['failed']} failed")
+
+
+def log_stage_times():
+    """Log the total time spent in each stage, summed across workers"""
+    stages = get_metrics().snapshot()["timers"].get("stage_seconds", [])
+    if stages:
+        logger.info("Stage time: " + ", ".join(
+            f"{entry['tags']['stage']} {entry['total_seconds']:.2f}s/{entry['count']}" for entry in stages
+        ))
+
+
+def read_ids_file(path: str) -> List[str]:
+    """Read applicant IDs from a file, one per line, skipping blanks and # comments"""
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+
+def compress_applicant(applicant_id: str, rejected_policy: str = REJECTED_LLM_POLICY):
     """Compress applicant data and perform analysis"""
     try:
-        compression_service = CompressionService()
+        compression_service = CompressionService(rejected_policy=rejected_policy)
         result = compression_service.compress_applicant(applicant_id)
-        
+
         # Log results
         logger.info(f"Applicant ID: {result['applicant_id']}")
         logger.info(f"Shortlist Status: {result['shortlist_status']}")
         logger.info(f"LLM Score: {result['llm_score']}")
         logger.info(f"Screening Reason: {result['reason']}")
-        
+        timings = ", ".join(f"{name} {seconds * 1e6:.1f}us" for name, seconds in result["rule_seconds"].items())
+        logger.info(f"Failed rules: {', '.join(result['failed_rules']) or 'none'} | Rule timings: {timings}")
+
     except Exception as e:
         logger.error(f"Error compressing applicant: {e}")
         sys.exit(1)
 
 
+def compress_applicants(applicant_ids: Optional[List[str]], args: argparse.Namespace, changed_only: bool = False):
+    """Compress many applicants in bulk (only changed ones with ``changed_only``) and report throughput"""
+    try:
+        compression_service = CompressionService(rejected_policy=args.rejected_policy)
+        if args.sequential:
+            if changed_only:
+                report = compression_service.compress_changed()
+            else:
+                report = compression_service.compress_applicants(applicant_ids)
+        else:
+            pipeline = CompressionPipeline(
+                compression_service,
+                airtable_concurrency=args.airtable_concurrency,
+                llm_concurrency=args.llm_concurrency,
+                llm_batch_size=args.llm_batch_size
+            )
+            report = pipeline.run_changed() if changed_only else pipeline.run(applicant_ids)
+    except Exception as e:
+        logger.error(f"Error compressing applicants: {e}")
+        sys.exit(1)
+
+    # Log per-applicant results
+    for result in report["results"]:
+        logger.info(f"Applicant ID: {result['applicant_id']} | Status: {result['shortlist_status']} | "
+                    f"Failed rules: {', '.join(result['failed_rules']) or 'none'} | LLM Score: {result['llm_score']}")
+    for applicant_id, error in report["errors"].items():
+        logger.error(f"Applicant ID: {applicant_id} | Failed: {error}")
+
+    logger.info(f"Compressed {len(report['results'])}/{report['total']} applicant(s) in "
+                f"{report['elapsed_seconds']:.1f}s ({report['applicants_per_second']:.2f} applicants/s)")
+    if "unchanged" in report:
+        logger.info(f"Skipped {report['unchanged']} unchanged applicant(s)")
+    log_request_stats()
+    log_stage_times()
+
+    for rule_name, stats in report["rules"].items():
+        logger.info(f"Rule {rule_name}: rejected {stats['fired']}/{stats['evaluated']} | "
+                    f"{stats['mean_microseconds']} us/applicant")
+
+    rejected = report["rejected_llm"]
+    logger.info(f"Rejected applicants: {rejected['rejected']} | LLM policy: {rejected['policy']} | "
+                f"Primary LLM calls saved: {rejected['llm_calls_saved']} (skipped {rejected['skipped']}, "
+                f"cheap model {rejected['cheap_model']}) | Deferred: {rejected['deferred']}")
+
+    cache = llm_service.get_cache()
+    if cache:
+        logger.info(f"LLM cache: {cache.stats()}")
+    provider = llm_service.get_provider()
+    if isinstance(provider, RouterProvider):
+        logger.info(f"LLM router: {provider.stats()}")
+
+    if report["errors"]:
+        sys.exit(1)
+
+
 def decompress_applicant(applicant_id: str):
     """Decompress applicant data and rebuild detailed records"""
     try:
         decompression_service = DecompressionService()
         result = decompression_service.decompress_applicant(applicant_id)
-        
+
         # Log results
         logger.info(f"Successfully decompressed applicant ID: {result['applicant_id']}")
         logger.info(f"Personal ID: {result['personal_id']}")
         logger.info(f"Personal Info: {result['personal'].name}, {result['personal'].email}")
         logger.info(f"Work Experience entries: {len(result['experience'])}")
         logger.info(f"Salary Preferences updated")
-        
+
     except Exception as e:
         logger.error(f"Error decompressing applicant: {e}")
         sys.exit(1)
 
 
+def decompress_applicants(applicant_ids: Optional[List[str]], args: argparse.Namespace):
+    """Decompress many applicants in bulk and report throughput"""
+    try:
+        decompression_service = DecompressionService()
+        report = decompression_service.decompress_applicants(
+            applicant_ids, concurrency=args.airtable_concurrency, processes=args.processes
+        )
+    except Exception as e:
+        logger.error(f"Error decompressing applicants: {e}")
+        sys.exit(1)
+
+    for result in report["results"]:
+        logger.info(f"Applicant ID: {result['applicant_id']} | Personal ID: {result['personal_id']} | "
+                    f"Work Experience entries: {len(result['experience'])}")
+    for applicant_id, error in report["errors"].items():
+        logger.error(f"Applicant ID: {applicant_id} | Failed: {error}")
+
+    logger.info(f"Decompressed {len(report['results'])}/{report['total']} applicant(s) in "
+                f"{report['elapsed_seconds']:.1f}s ({report['applicants_per_second']:.2f} applicants/s)")
+    log_request_stats()
+    log_stage_times()
+
+    if report["errors"]:
+        sys.exit(1)
+
+
+def rebuild_index(path: Optional[str]):
+    """Rebuild the local ApplicantId -> record ID index"""
+    if not path:
+        logger.error("No index path given. Pass --path or set AIRTABLE_RECORD_INDEX")
+        sys.exit(1)
+    try:
+        index = LinkedRecordIndex(path)
+        counts = index.rebuild(get_shared_client())
+        index.close()
+    except Exception as e:
+        logger.error(f"Error rebuilding record index: {e}")
+        sys.exit(1)
+
+    for table_name, count in counts.items():
+        logger.info(f"Indexed {count} {table_name} record(s)")
+
+
 if __name__ == "__main__":
     main()
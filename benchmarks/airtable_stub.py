@@ -0,0 +1,58 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every Airtable call with a small canned record after a fixed delay"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients can reuse connections
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def setup(self):
+        super().setup()
+        # Models the TCP/TLS handshake a fresh connection pays before its first request
+        time.sleep(self.server.connect_delay)
+
+    def do_GET(self):
+        self._respond({"records": [{"id": "recStub", "createdTime": "2024-01-01T00:00:00.000Z", "fields": {}}]})
+
+    def do_POST(self):
+        self._read_body()
+        self._respond({"id": "recStub", "createdTime": "2024-01-01T00:00:00.000Z", "fields": {}})
+
+    def do_PATCH(self):
+        self._read_body()
+        self._respond({"id": "recStub", "fields": {}})
+
+    def do_DELETE(self):
+        self._respond({"id": "recStub", "deleted": True})
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length:
+            self.rfile.read(length)
+
+    def _respond(self, payload):
+        time.sleep(self.server.latency)
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(latency: float = 0.01, connect_delay: float = 0.03) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stub server on a free local port and return it with its API URL"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.connect_delay = connect_delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v0"
@@ -0,0 +1,84 @@
+"""Compare per-applicant screening with the column-wise bulk screener.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_bulk_screening --applicants 1000000
+
+Synthetic applicants (with some missing or malformed dates) are screened
+with ScreeningService.get_shortlist_status one at a time and with
+ScreeningService.screen_batch, and the two results are checked for equality.
+The scalar path is timed on --scalar-sample applicants and extrapolated.
+"""
+import argparse
+import random
+import time
+from models.applicant import Applicant, PersonalInfo, SalaryPreferences, WorkExperience
+from services import bulk_screening
+from services.screening_service import ScreeningService
+
+COMPANIES = ["Google", "Meta", "OpenAI", "Acme", "Globex", "Initech", "Umbrella", "Hooli"]
+LOCATIONS = ["USA", "Canada", "UK", "Germany", "India", "Brazil", "France", None]
+
+
+def random_date(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.02:
+        return None
+    if roll < 0.03:
+        return "not a date"
+    return f"{rng.randint(2005, 2024)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+
+def make_applicants(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    applicants = []
+    for i in range(count):
+        experience = tuple(
+            WorkExperience(company=rng.choice(COMPANIES), title="Engineer",
+                           start=random_date(rng), end=random_date(rng))
+            for _ in range(rng.randint(0, 4))
+        )
+        applicants.append(Applicant(
+            PersonalInfo(name=f"Applicant {i}", location=rng.choice(LOCATIONS)),
+            experience,
+            SalaryPreferences(preferred_rate=rng.choice([None, 0, 60, 90, 100, 120]),
+                              availability=rng.choice([None, 10, 20, 40]))
+        ))
+    return applicants
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--applicants", type=int, default=200_000)
+    parser.add_argument("--scalar-sample", type=int, default=50_000,
+                        help="Applicants screened one at a time (the scalar path is slow)")
+    parser.add_argument("--no-numpy", action="store_true", help="Use the pure-Python bulk path")
+    args = parser.parse_args()
+
+    if args.no_numpy:
+        bulk_screening.USE_NUMPY = False
+
+    applicants = make_applicants(args.applicants)
+    sample = applicants[:min(args.scalar_sample, len(applicants))]
+
+    started = time.perf_counter()
+    scalar = [ScreeningService.get_shortlist_status(applicant) for applicant in sample]
+    scalar_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    bulk = ScreeningService.screen_batch(applicants)
+    bulk_seconds = time.perf_counter() - started
+
+    assert bulk[:len(sample)] == scalar, "bulk screening differs from the scalar path"
+    scalar_rate = len(sample) / scalar_seconds
+    bulk_rate = len(applicants) / bulk_seconds
+    engine = "pure Python" if bulk_screening.numpy_module() is None else "numpy"
+    print(f"scalar               {scalar_rate:12,.0f} applicants/s "
+          f"(~{len(applicants) / scalar_rate:.1f}s for {len(applicants):,})")
+    print(f"bulk ({engine:<11}) {bulk_rate:12,.0f} applicants/s "
+          f"({bulk_seconds:.1f}s for {len(applicants):,})")
+    print(f"speedup              {bulk_rate / scalar_rate:12.1f}x, {len(sample):,} results identical")
+
+
+if __name__ == "__main__":
+    main()
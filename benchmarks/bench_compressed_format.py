@@ -0,0 +1,84 @@
+"""Compare the size and speed of the "Compressed JSON" cell encodings.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_compressed_format --applicants 20000
+
+Synthetic applicants with every field filled in are encoded in each format in
+services.compressed_format, and decoded back through the version detection
+used by DecompressionService. The legacy indented JSON is the baseline. The
+msgpack format is skipped when the msgpack package is not installed.
+"""
+import argparse
+import random
+import time
+from services import compressed_format
+
+COMPANIES = ["Google", "Meta", "OpenAI", "Acme Corp", "Initech", "Globex", "Umbrella", "Hooli"]
+TITLES = ["Software Engineer", "Senior Engineer", "Data Scientist", "Engineering Manager"]
+TECHNOLOGIES = ["Python", "Go", "Kubernetes", "PostgreSQL", "React", "TensorFlow", "AWS"]
+LOCATIONS = ["USA", "Canada", "UK", "Germany", "India", "Brazil"]
+
+
+def make_compressed(count: int, seed: int = 5):
+    rng = random.Random(seed)
+    applicants = []
+    for i in range(count):
+        applicants.append({
+            "personal": {
+                "name": f"Applicant {i}",
+                "email": f"applicant{i}@example.com",
+                "location": rng.choice(LOCATIONS),
+                "linkedin": f"https://linkedin.com/in/applicant-{i}"
+            },
+            "experience": [
+                {
+                    "company": rng.choice(COMPANIES),
+                    "title": rng.choice(TITLES),
+                    "start": f"{rng.randint(2005, 2020)}-{rng.randint(1, 12):02d}-01",
+                    "end": rng.choice([None, f"{rng.randint(2021, 2025)}-{rng.randint(1, 12):02d}-01"]),
+                    "technologies": ", ".join(rng.sample(TECHNOLOGIES, 3))
+                }
+                for _ in range(rng.randint(1, 4))
+            ],
+            "salary": {
+                "preferred_rate": rng.choice([60, 90, 100, 120]),
+                "minimum_rate": rng.choice([50, 80]),
+                "currency": "USD",
+                "availability": rng.choice([20, 30, 40])
+            }
+        })
+    return applicants
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--applicants", type=int, default=20_000)
+    args = parser.parse_args()
+
+    applicants = make_compressed(args.applicants)
+    baseline = None
+    for fmt in compressed_format.FORMATS:
+        try:
+            started = time.perf_counter()
+            cells = [compressed_format.encode(applicant, fmt) for applicant in applicants]
+            encode_seconds = time.perf_counter() - started
+        except compressed_format.CompressedFormatError as e:
+            print(f"{fmt:<8} skipped: {e}")
+            continue
+
+        started = time.perf_counter()
+        decoded = [compressed_format.decode(cell) for cell in cells]
+        decode_seconds = time.perf_counter() - started
+        assert decoded == applicants, f"{fmt} does not round-trip"
+
+        size = sum(len(cell) for cell in cells) / len(cells)
+        baseline = baseline or size
+        print(f"{fmt:<8} {size:8.0f} chars/cell ({size / baseline:4.0%} of legacy)  "
+              f"encode {encode_seconds / len(cells) * 1e6:6.1f} us  decode {decode_seconds / len(cells) * 1e6:6.1f} us")
+        # Freed before the next format is timed, so its decode does not pay for collecting these
+        del cells, decoded
+
+
+if __name__ == "__main__":
+    main()
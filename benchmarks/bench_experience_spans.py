@@ -0,0 +1,82 @@
+"""Compare the old per-row strptime experience calculation with services.experience_spans.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_experience_spans --applicants 100000
+
+Both functions total the same synthetic work histories (repeated dates, some
+open-ended roles and some overlapping roles). The old function is reproduced
+here as it was in config/business_rules.py. The totals differ where roles
+overlap or have no end date, because the old function double-counted overlaps
+and skipped open-ended roles; the benchmark reports how many applicants that
+affects.
+"""
+import argparse
+import logging
+import random
+import time
+from datetime import datetime
+from models.applicant import WorkExperience
+from services.experience_spans import parse_date, total_experience_years
+
+logger = logging.getLogger(__name__)
+
+
+def legacy_total_experience(experience_list):
+    """The original calculate_total_experience"""
+    total_days = 0
+    for exp in experience_list:
+        try:
+            start = datetime.strptime(exp["start"], "%Y-%m-%d")
+            end = datetime.strptime(exp["end"], "%Y-%m-%d")
+            total_days += (end - start).days
+        except Exception as e:
+            logger.warning(f"Error parsing dates: {e}")
+            continue
+    return total_days / 365  # convert to years
+
+
+def make_histories(count: int, seed: int = 11):
+    rng = random.Random(seed)
+    histories = []
+    for _ in range(count):
+        roles = []
+        year = rng.randint(2000, 2015)
+        for _ in range(rng.randint(1, 4)):
+            start_year = year + rng.randint(-1, 1)  # sometimes overlaps the previous role
+            end_year = start_year + rng.randint(1, 4)
+            end = None if rng.random() < 0.1 else f"{end_year}-{rng.randint(1, 12):02d}-01"
+            roles.append(WorkExperience(start=f"{start_year}-{rng.randint(1, 12):02d}-01", end=end))
+            year = end_year
+        histories.append(roles)
+    return histories
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--applicants", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # The old function logs a warning per open-ended role; keep that out of the timing
+    logging.disable(logging.WARNING)
+    histories = make_histories(args.applicants)
+    as_dicts = [[{"start": exp.start, "end": exp.end} for exp in roles] for roles in histories]
+
+    started = time.perf_counter()
+    legacy = [legacy_total_experience(roles) for roles in as_dicts]
+    legacy_seconds = time.perf_counter() - started
+
+    parse_date.cache_clear()
+    started = time.perf_counter()
+    merged = [total_experience_years(roles) for roles in histories]
+    merged_seconds = time.perf_counter() - started
+
+    changed = sum(1 for old, new in zip(legacy, merged) if abs(old - new) > 1e-9)
+    print(f"legacy strptime     {legacy_seconds * 1e6 / args.applicants:8.2f} us/applicant")
+    print(f"experience_spans    {merged_seconds * 1e6 / args.applicants:8.2f} us/applicant "
+          f"({legacy_seconds / merged_seconds:.1f}x faster, date cache {parse_date.cache_info().currsize} entries)")
+    print(f"{changed:,} of {args.applicants:,} totals changed by merging overlaps and counting open-ended roles")
+
+
+if __name__ == "__main__":
+    main()
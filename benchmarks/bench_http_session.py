@@ -0,0 +1,86 @@
+"""Compare per-applicant Airtable latency with and without a pooled keep-alive session.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_http_session --applicants 50
+
+Each simulated applicant makes the calls a compress run makes: three reads
+(Personal Details, Work Experience, Salary Preferences) and an upsert
+(lookup + PATCH) on Applicants, all against a local stub server. The stub
+returns empty records, so the upsert always has a changed field to PATCH and
+every variant sends the same five requests.
+"""
+import argparse
+import statistics
+import time
+import requests
+from benchmarks.airtable_stub import start_stub_server
+from config.airtable_config import HEADERS
+from data_access.airtable_client import AirtableClient
+from data_access.rate_limiter import TokenBucket
+
+TABLES = ["Personal Details", "Work Experience", "Salary Preferences"]
+
+# Differs from the stub's empty fields, so upsert_record never skips its PATCH
+APPLICANT_FIELDS = {"Compressed JSON": "{}"}
+
+
+def unpooled_applicant(api_url: str):
+    """One fresh connection per call, as the client did with module-level requests.*"""
+    for table in TABLES:
+        requests.get(f"{api_url}/base/{table}", headers=HEADERS).raise_for_status()
+    requests.get(f"{api_url}/base/Applicants", headers=HEADERS).raise_for_status()
+    requests.patch(f"{api_url}/base/Applicants/recStub", headers=HEADERS, json={"fields": APPLICANT_FIELDS}).raise_for_status()
+
+
+def pooled_applicant(client: AirtableClient):
+    """Sequential calls over the client's keep-alive session"""
+    for table in TABLES:
+        client.fetch_records(table)
+    client.upsert_record("Applicants", "{ApplicantId} = 1", APPLICANT_FIELDS)
+
+
+def pooled_concurrent_applicant(client: AirtableClient):
+    """Keep-alive session with the three independent reads issued at once"""
+    client.map_concurrent(client.fetch_records, TABLES)
+    client.upsert_record("Applicants", "{ApplicantId} = 1", APPLICANT_FIELDS)
+
+
+def measure(label: str, run_applicant, applicants: int):
+    """Time ``applicants`` sequential runs and print per-applicant latency"""
+    samples = []
+    for _ in range(applicants):
+        started = time.perf_counter()
+        run_applicant()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"{label:<28} mean {statistics.mean(samples):7.1f} ms/applicant   "
+          f"median {statistics.median(samples):7.1f} ms")
+    return statistics.mean(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--applicants", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.01, help="Server time per request (s)")
+    parser.add_argument("--connect-delay", type=float, default=0.03, help="Handshake cost per new connection (s)")
+    args = parser.parse_args()
+
+    server, api_url = start_stub_server(args.latency, args.connect_delay)
+    client = AirtableClient(api_url=api_url)
+    client.base_id = "base"
+    # Measure connection costs only, not the 5 req/s Airtable quota
+    client.rate_limiter = TokenBucket(rate=10_000)
+    try:
+        baseline = measure("unpooled (requests.*)", lambda: unpooled_applicant(api_url), args.applicants)
+        pooled = measure("pooled session", lambda: pooled_applicant(client), args.applicants)
+        concurrent = measure("pooled + concurrent reads", lambda: pooled_concurrent_applicant(client), args.applicants)
+    finally:
+        client.close()
+        server.shutdown()
+
+    print(f"Latency drop vs unpooled: pooled {100 * (1 - pooled / baseline):.0f}%, "
+          f"pooled + concurrent {100 * (1 - concurrent / baseline):.0f}%")
+
+
+if __name__ == "__main__":
+    main()
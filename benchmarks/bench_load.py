@@ -0,0 +1,148 @@
+"""End-to-end load test of compress and decompress against the in-memory fake Airtable.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_load --applicants 200 --rate 5
+
+N synthetic applicants are seeded into Personal Details, Work Experience and
+Salary Preferences on a local benchmarks.fake_airtable server, which throttles
+to ``--rate`` requests per second with 429s, as Airtable does per base. The
+real AirtableClient, ApplicantRepository and services then run, with Gemini
+replaced by the offline FakeProvider. Three phases run in order:
+
+- compress: CompressionPipeline over every applicant
+- compress-changed: the same run again, which should find nothing to do
+- decompress-all: DecompressionService.decompress_applicants
+
+For each phase this prints applicants per second, Airtable requests per
+applicant (counted by the server) and p50/p95/p99 client-side request latency,
+including time spent waiting on the rate limiter and retrying 429s.
+"""
+import argparse
+import logging
+import statistics
+import threading
+import time
+from typing import Dict, List
+from benchmarks.bench_compressed_format import make_compressed
+from benchmarks.fake_airtable import start_fake_airtable
+from config.airtable_config import TABLE_PERSONAL, TABLE_EXPERIENCE, TABLE_SALARY
+from data_access.airtable_client import AirtableClient
+from data_access.applicant_repository import ApplicantRepository
+from data_access.rate_limiter import TokenBucket
+from services import llm_service
+from services.compression_pipeline import CompressionPipeline
+from services.compression_service import CompressionService
+from services.decompression_service import DecompressionService
+from services.llm_provider import FakeProvider
+
+
+def seed(store, count: int):
+    """Source rows for ``count`` applicants, with ApplicantIds 1..count"""
+    applicants = make_compressed(count)
+    parents = store.seed(TABLE_PERSONAL, [
+        {
+            "ApplicantId": i,
+            "Full Name": applicant["personal"]["name"],
+            "Email": applicant["personal"]["email"],
+            "Location": applicant["personal"]["location"],
+            "LinkedIn": applicant["personal"]["linkedin"]
+        }
+        for i, applicant in enumerate(applicants, start=1)
+    ])
+    experience, salary = [], []
+    for parent, applicant in zip(parents, applicants):
+        link = {"Personal Details": [parent["id"]]}
+        for exp in applicant["experience"]:
+            experience.append({
+                **link, "Company": exp["company"], "Title": exp["title"], "Start": exp["start"],
+                "End": exp["end"], "Technologies": exp["technologies"]
+            })
+        pay = applicant["salary"]
+        salary.append({
+            **link, "Preferred Rate": pay["preferred_rate"], "Minimum Rate": pay["minimum_rate"],
+            "Currency": pay["currency"], "Availability (hrs/wk)": pay["availability"]
+        })
+    store.seed(TABLE_EXPERIENCE, experience)
+    store.seed(TABLE_SALARY, salary)
+
+
+def timed_requests(client: AirtableClient) -> List[float]:
+    """Record the latency of every client request, in milliseconds"""
+    samples: List[float] = []
+    lock = threading.Lock()
+    request = client._request
+
+    def _request(method, url, **kwargs):
+        started = time.perf_counter()
+        try:
+            return request(method, url, **kwargs)
+        finally:
+            with lock:
+                samples.append((time.perf_counter() - started) * 1000)
+
+    client._request = _request
+    return samples
+
+
+def measure(label: str, run, applicants: int, store, samples: List[float]) -> Dict:
+    """Run one phase and print its rates, per seeded applicant"""
+    store.reset_stats()
+    samples.clear()
+    started = time.perf_counter()
+    report = run()
+    elapsed = time.perf_counter() - started
+
+    stats = store.stats()
+    p50, p95, p99 = (statistics.quantiles(samples, n=100)[i] for i in (49, 94, 98)) if len(samples) > 1 else (0, 0, 0)
+    print(f"{label:<17} {applicants / elapsed:7.2f} applicants/s  "
+          f"{stats['requests'] / applicants:5.2f} requests/applicant  "
+          f"p50 {p50:7.1f} ms  p95 {p95:7.1f} ms  p99 {p99:7.1f} ms  "
+          f"429s {stats['throttled']:4d}  errors {len(report['errors'])}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--applicants", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=5, help="Requests/s allowed by client and server (Airtable: 5)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Server time per request (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Fake Gemini time per call (s)")
+    parser.add_argument("--airtable-concurrency", type=int, default=5)
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    args = parser.parse_args()
+    # 429 retries are expected under load; keep their warnings out of the table
+    logging.basicConfig(level=logging.ERROR)
+
+    server, store, api_url = start_fake_airtable(args.latency, rate_limit=args.rate, retry_after=1)
+    seed(store, args.applicants)
+
+    client = AirtableClient(api_url=api_url)
+    client.base_id = "base"
+    client.rate_limiter = TokenBucket(rate=args.rate)
+    samples = timed_requests(client)
+    repository = ApplicantRepository(client)
+    provider = FakeProvider(latency=args.llm_latency)
+    llm_service.set_provider(provider)
+    llm_service.set_cache_enabled(False)
+
+    pipeline = CompressionPipeline(CompressionService(repository), airtable_concurrency=args.airtable_concurrency,
+                                   llm_concurrency=args.llm_concurrency)
+    decompression = DecompressionService(repository)
+    print(f"{args.applicants} applicants, {args.rate:g} requests/s, {args.latency * 1000:.0f} ms server latency, "
+          f"{args.llm_latency * 1000:.0f} ms LLM latency")
+    try:
+        measure("compress", pipeline.run, args.applicants, store, samples)
+        llm_calls = provider.calls
+        measure("compress-changed", pipeline.run_changed, args.applicants, store, samples)
+        print(f"{'':<17} LLM calls: compress {llm_calls}, compress-changed {provider.calls - llm_calls}")
+        measure("decompress-all", lambda: decompression.decompress_applicants(
+            concurrency=args.airtable_concurrency), args.applicants, store, samples)
+    finally:
+        llm_service.set_provider(None)
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
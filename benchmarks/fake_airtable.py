@@ -0,0 +1,403 @@
+"""An in-memory stand-in for the Airtable REST API, for benchmarks and offline runs.
+
+Implements what AirtableClient and ApplicantRepository use:
+
+- list with ``pageSize``/``offset`` pagination, ``fields[]`` projection and
+  ``filterByFormula`` for the formulas the repository builds (field
+  comparisons, OR/AND, FIND, ARRAYJOIN, COUNTA and RECORD_ID)
+- single-record create, PATCH and delete
+- the multi-record create/PATCH/delete endpoints, capped at 10 records
+- 429 throttling above a per-base request rate (a token bucket holding one
+  second of requests), and a fixed latency per request
+
+Link fields hold record IDs. In formulas they evaluate to the linked rows'
+primary field (ApplicantId), as in Airtable. The record-ID lookup fields
+evaluate to the linked record IDs. Empty values are left out of stored
+records, as Airtable omits them from responses.
+"""
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+from config.airtable_config import (
+    APPLICANTS_TABLE,
+    APPLICANT_RECORD_ID_FIELD,
+    PERSONAL_RECORD_ID_FIELD,
+    TABLE_PERSONAL
+)
+
+MAX_PAGE_SIZE = 100
+MAX_BATCH_SIZE = 10
+PRIMARY_FIELD = "ApplicantId"
+
+# Link field -> table it points at
+LINK_FIELDS = {"Personal Details": TABLE_PERSONAL, "Applicants": APPLICANTS_TABLE}
+# Record-ID lookup field -> link field it looks through
+LOOKUP_FIELDS = {PERSONAL_RECORD_ID_FIELD: "Personal Details", APPLICANT_RECORD_ID_FIELD: "Applicants"}
+
+
+class FormulaError(ValueError):
+    """A filterByFormula the fake does not understand (Airtable answers 422)"""
+
+
+class FakeAirtable:
+    """Thread-safe in-memory tables with request counters and an optional rate limit"""
+
+    def __init__(self, latency: float = 0.0, rate_limit: Optional[float] = None,
+                 retry_after: Optional[float] = None):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.tables: Dict[str, Dict[str, Dict]] = {}
+        self._ids = count(1)
+        self._lock = threading.RLock()
+        self._tokens = rate_limit or 0.0
+        self._refilled = time.monotonic()
+        self.requests: Dict[str, int] = {}
+        self.throttled = 0
+
+    # -- storage -----------------------------------------------------------------
+
+    def seed(self, table_name: str, fields_list: List[Dict]) -> List[Dict]:
+        """Insert records directly, without going through HTTP or the counters"""
+        with self._lock:
+            return [self._create(table_name, fields) for fields in fields_list]
+
+    def table(self, table_name: str) -> Dict[str, Dict]:
+        with self._lock:
+            return self.tables.setdefault(table_name, {})
+
+    def _create(self, table_name: str, fields: Dict) -> Dict:
+        record = {
+            "id": f"rec{next(self._ids):014d}",
+            "createdTime": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+            "fields": _without_empty(fields)
+        }
+        self.table(table_name)[record["id"]] = record
+        return record
+
+    def _update(self, table_name: str, record_id: str, fields: Dict) -> Optional[Dict]:
+        record = self.table(table_name).get(record_id)
+        if record is None:
+            return None
+        record["fields"] = _without_empty({**record["fields"], **fields})
+        return record
+
+    # -- throttling and counters --------------------------------------------------
+
+    def admit(self, method: str) -> bool:
+        """Count a request; False when it exceeds the per-second rate limit"""
+        with self._lock:
+            self.requests[method] = self.requests.get(method, 0) + 1
+            if self.rate_limit is None:
+                return True
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens < 1:
+                self.throttled += 1
+                return False
+            self._tokens -= 1
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"requests": sum(self.requests.values()), "by_method": dict(self.requests),
+                    "throttled": self.throttled}
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = {}
+            self.throttled = 0
+
+    # -- REST operations ----------------------------------------------------------
+
+    def list(self, table_name: str, params: Dict[str, List[str]]) -> Tuple[int, Dict]:
+        formula = params.get("filterByFormula", [None])[0]
+        fields = params.get("fields[]")
+        page_size = min(int(params.get("pageSize", [MAX_PAGE_SIZE])[0]), MAX_PAGE_SIZE)
+        start = int(params.get("offset", ["itr0"])[0][3:] or 0)
+        with self._lock:
+            try:
+                predicate = Formula(formula, self) if formula else None
+                records = [record for record in self.table(table_name).values()
+                           if predicate is None or predicate.matches(record)]
+            except FormulaError as e:
+                return 422, _error("INVALID_FILTER_BY_FORMULA", str(e))
+            page = [_project(record, fields) for record in records[start:start + page_size]]
+        body = {"records": page}
+        if start + page_size < len(records):
+            body["offset"] = f"itr{start + page_size}"
+        return 200, body
+
+    def create(self, table_name: str, body: Dict) -> Tuple[int, Dict]:
+        with self._lock:
+            if "records" not in body:
+                return 200, self._create(table_name, body.get("fields", {}))
+            if len(body["records"]) > MAX_BATCH_SIZE:
+                return 422, _error("INVALID_RECORDS", f"At most {MAX_BATCH_SIZE} records per request")
+            return 200, {"records": [self._create(table_name, item.get("fields", {})) for item in body["records"]]}
+
+    def update(self, table_name: str, record_id: Optional[str], body: Dict) -> Tuple[int, Dict]:
+        with self._lock:
+            if record_id:
+                record = self._update(table_name, record_id, body.get("fields", {}))
+                return (200, record) if record else (404, _error("NOT_FOUND", f"Record {record_id} not found"))
+            items = body.get("records", [])
+            if len(items) > MAX_BATCH_SIZE:
+                return 422, _error("INVALID_RECORDS", f"At most {MAX_BATCH_SIZE} records per request")
+            missing = [item["id"] for item in items if item["id"] not in self.table(table_name)]
+            if missing:
+                return 404, _error("NOT_FOUND", f"Records not found: {missing}")
+            return 200, {"records": [self._update(table_name, item["id"], item.get("fields", {})) for item in items]}
+
+    def delete(self, table_name: str, record_ids: List[str]) -> Tuple[int, Dict]:
+        with self._lock:
+            if len(record_ids) > MAX_BATCH_SIZE:
+                return 422, _error("INVALID_RECORDS", f"At most {MAX_BATCH_SIZE} records per request")
+            table = self.table(table_name)
+            missing = [record_id for record_id in record_ids if record_id not in table]
+            if missing:
+                return 404, _error("NOT_FOUND", f"Records not found: {missing}")
+            for record_id in record_ids:
+                del table[record_id]
+            return 200, {"records": [{"id": record_id, "deleted": True} for record_id in record_ids]}
+
+    # -- formula support ----------------------------------------------------------
+
+    def field_value(self, record: Dict, name: str) -> Any:
+        """A field as a formula sees it: links as primary values, record-ID lookups as IDs"""
+        if name in LOOKUP_FIELDS:
+            return list(record["fields"].get(LOOKUP_FIELDS[name], []))
+        value = record["fields"].get(name)
+        if name in LINK_FIELDS and isinstance(value, list):
+            linked = self.table(LINK_FIELDS[name])
+            return [linked[record_id]["fields"].get(PRIMARY_FIELD) for record_id in value if record_id in linked]
+        return value
+
+
+class Formula:
+    """Parser and evaluator for the subset of Airtable formulas the repository uses"""
+
+    TOKEN = re.compile(r"\s*(?:(\{[^}]*\})|('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\")|"
+                       r"(-?\d+(?:\.\d+)?)|([A-Za-z_]+)|(!=|>=|<=|[=<>(),]))")
+
+    def __init__(self, text: str, store: FakeAirtable):
+        self.store = store
+        self.tokens = self._tokenize(text)
+        self.position = 0
+        self.tree = self._comparison()
+        if self.position != len(self.tokens):
+            raise FormulaError(f"Unexpected token {self.tokens[self.position][1]!r} in {text!r}")
+
+    def matches(self, record: Dict) -> bool:
+        return _truthy(self._evaluate(self.tree, record))
+
+    def _tokenize(self, text: str) -> List[Tuple[str, str]]:
+        tokens = []
+        position = 0
+        text = text.strip()
+        while position < len(text):
+            match = self.TOKEN.match(text, position)
+            if not match or match.end() == position:
+                raise FormulaError(f"Cannot parse formula {text!r} at {position}")
+            field, string, number, name, symbol = match.groups()
+            if field:
+                tokens.append(("field", field[1:-1]))
+            elif string:
+                tokens.append(("value", string[1:-1]))
+            elif number:
+                tokens.append(("value", float(number) if "." in number else int(number)))
+            elif name:
+                tokens.append(("name", name.upper()))
+            else:
+                tokens.append(("symbol", symbol))
+            position = match.end()
+        return tokens
+
+    def _peek(self) -> Optional[Tuple[str, Any]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _take(self, symbol: Optional[str] = None) -> Tuple[str, Any]:
+        token = self._peek()
+        if token is None or (symbol is not None and token != ("symbol", symbol)):
+            raise FormulaError(f"Expected {symbol or 'a term'}, got {token}")
+        self.position += 1
+        return token
+
+    def _comparison(self):
+        left = self._term()
+        token = self._peek()
+        if token and token[0] == "symbol" and token[1] in ("=", "!=", ">", "<", ">=", "<="):
+            self.position += 1
+            return ("compare", token[1], left, self._term())
+        return left
+
+    def _term(self):
+        kind, value = self._take()
+        if kind in ("field", "value"):
+            return (kind, value)
+        if kind == "name":
+            self._take("(")
+            arguments = []
+            if self._peek() != ("symbol", ")"):
+                arguments.append(self._comparison())
+                while self._peek() == ("symbol", ","):
+                    self.position += 1
+                    arguments.append(self._comparison())
+            self._take(")")
+            return ("call", value, arguments)
+        raise FormulaError(f"Unexpected symbol {value!r}")
+
+    def _evaluate(self, node, record: Dict) -> Any:
+        kind = node[0]
+        if kind == "value":
+            return node[1]
+        if kind == "field":
+            return self.store.field_value(record, node[1])
+        if kind == "compare":
+            return _compare(node[1], self._evaluate(node[2], record), self._evaluate(node[3], record))
+
+        name, arguments = node[1], node[2]
+        if name == "RECORD_ID":
+            return record["id"]
+        values = [self._evaluate(argument, record) for argument in arguments]
+        if name == "OR":
+            return any(_truthy(value) for value in values)
+        if name == "AND":
+            return all(_truthy(value) for value in values)
+        if name == "ARRAYJOIN":
+            separator = values[1] if len(values) > 1 else ", "
+            return separator.join(str(value) for value in values[0] or [])
+        if name == "COUNTA":
+            value = values[0]
+            return len([item for item in value if item not in (None, "")]) if isinstance(value, list) else int(value not in (None, ""))
+        if name == "FIND":
+            return _text(values[1]).find(_text(values[0])) + 1
+        raise FormulaError(f"Unsupported function {name}")
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return ", ".join(_text(item) for item in value)
+    return str(value)
+
+
+def _compare(op: str, left: Any, right: Any) -> bool:
+    left = _text(left) if isinstance(left, list) else left
+    right = _text(right) if isinstance(right, list) else right
+    # Numbers compare numerically with numeric text, as Airtable coerces them
+    try:
+        if isinstance(left, (int, float)) or isinstance(right, (int, float)):
+            left, right = float(left if left not in (None, "") else 0), float(right if right not in (None, "") else 0)
+    except (TypeError, ValueError):
+        left, right = _text(left), _text(right)
+    else:
+        if not isinstance(left, float):
+            left, right = _text(left), _text(right)
+    return {
+        "=": left == right, "!=": left != right, ">": left > right,
+        "<": left < right, ">=": left >= right, "<=": left <= right
+    }[op]
+
+
+def _truthy(value: Any) -> bool:
+    return bool(value) and value != "0"
+
+
+def _without_empty(fields: Dict) -> Dict:
+    return {name: value for name, value in fields.items() if value is not None and value != "" and value != []}
+
+
+def _project(record: Dict, fields: Optional[List[str]]) -> Dict:
+    if not fields:
+        return {**record, "fields": dict(record["fields"])}
+    return {**record, "fields": {name: value for name, value in record["fields"].items() if name in fields}}
+
+
+def _error(error_type: str, message: str) -> Dict:
+    return {"error": {"type": error_type, "message": message}}
+
+
+class FakeAirtableHandler(BaseHTTPRequestHandler):
+    """Routes /v0/<base>/<table>[/<record id>] to the server's FakeAirtable"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def _handle(self, method: str):
+        store: FakeAirtable = self.server.store
+        url = urlparse(self.path)
+        parts = [unquote(part) for part in url.path.split("/") if part]
+        params = parse_qs(url.query)
+        body = self._read_body()
+
+        if store.latency:
+            time.sleep(store.latency)
+        if not store.admit(method):
+            headers = {"Retry-After": str(store.retry_after)} if store.retry_after is not None else {}
+            return self._respond(429, _error("RATE_LIMIT_REACHED", "Rate limit exceeded"), headers)
+        if len(parts) not in (3, 4):
+            return self._respond(404, _error("NOT_FOUND", "Unknown path"))
+
+        table_name = parts[2]
+        record_id = parts[3] if len(parts) == 4 else None
+        if method == "GET" and record_id is None:
+            status, payload = store.list(table_name, params)
+        elif method == "POST" and record_id is None:
+            status, payload = store.create(table_name, body)
+        elif method == "PATCH":
+            status, payload = store.update(table_name, record_id, body)
+        elif method == "DELETE":
+            status, payload = store.delete(table_name, [record_id] if record_id else params.get("records[]", []))
+        else:
+            status, payload = 404, _error("NOT_FOUND", "Unsupported route")
+        if status == 200 and record_id and method == "DELETE":
+            payload = payload["records"][0]
+        self._respond(status, payload)
+
+    def _read_body(self) -> Dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _respond(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_airtable(latency: float = 0.0, rate_limit: Optional[float] = None,
+                        retry_after: Optional[float] = None) -> Tuple[ThreadingHTTPServer, FakeAirtable, str]:
+    """Start the fake on a free local port; returns the server, its store and its API URL"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeAirtableHandler)
+    server.daemon_threads = True
+    server.store = FakeAirtable(latency, rate_limit, retry_after)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, server.store, f"http://127.0.0.1:{server.server_address[1]}/v0"
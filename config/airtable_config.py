@@ -6,6 +6,32 @@ load_dotenv()
 # Airtable configuration
 AIRTABLE_API_KEY = os.getenv("AIRTABLE_API_KEY")
 BASE_ID = os.getenv("AIRTABLE_BASE_ID")
+API_URL = os.getenv("AIRTABLE_API_URL", "https://api.airtable.com/v0")
+
+# HTTP connection pooling
+POOL_SIZE = int(os.getenv("AIRTABLE_POOL_SIZE", "10"))  # keep-alive connections kept per host
+MAX_WORKERS = int(os.getenv("AIRTABLE_MAX_WORKERS", "5"))  # concurrent in-flight requests
+
+# Rate limiting and retries (Airtable allows 5 requests per second per base)
+RATE_LIMIT = float(os.getenv("AIRTABLE_RATE_LIMIT", "5"))
+MAX_RETRIES = int(os.getenv("AIRTABLE_MAX_RETRIES", "5"))
+BACKOFF_BASE = float(os.getenv("AIRTABLE_BACKOFF_BASE", "0.5"))  # seconds
+BACKOFF_MAX = float(os.getenv("AIRTABLE_BACKOFF_MAX", "30"))  # seconds
+
+# Optional SQLite file mapping ApplicantIds to record IDs; unset disables the local index
+RECORD_INDEX_PATH = os.getenv("AIRTABLE_RECORD_INDEX")
+
+# Encoding of the "Compressed JSON" cell: compact (minified, short keys), msgpack
+# (needs the msgpack package) or legacy (indented JSON). Every format is readable
+COMPRESSED_FORMAT = os.getenv("COMPRESSED_FORMAT", "compact")
+# Worker processes decoding Compressed JSON cells in bulk decompression; 0 uses every CPU
+DECOMPRESS_PROCESSES = int(os.getenv("DECOMPRESS_PROCESSES", "0"))
+
+# Applicants field holding the hash of the source data behind "Compressed JSON",
+# used by compress-changed to skip applicants whose source rows did not change
+CONTENT_HASH_FIELD = os.getenv("AIRTABLE_CONTENT_HASH_FIELD", "Content Hash")
+# Maximum characters in an Airtable long text cell
+CELL_LIMIT = int(os.getenv("AIRTABLE_CELL_LIMIT", "100000"))
 
 # Table names
 TABLE_PERSONAL = "Personal Details"
@@ -14,6 +40,11 @@ TABLE_SALARY = "Salary Preferences"
 APPLICANTS_TABLE = "Applicants"
 SHORTLISTED_TABLE = "Shortlisted Leads"
 
+# Lookup fields on child tables holding the linked parent's RECORD_ID(), so child rows
+# for one parent can be filtered server-side instead of scanning the whole table
+PERSONAL_RECORD_ID_FIELD = os.getenv("AIRTABLE_PERSONAL_RECORD_ID_FIELD", "Personal Details Record ID")
+APPLICANT_RECORD_ID_FIELD = os.getenv("AIRTABLE_APPLICANT_RECORD_ID_FIELD", "Applicant Record ID")
+
 HEADERS = {
     "Authorization": f"Bearer {AIRTABLE_API_KEY}",
     "Content-Type": "application/json"
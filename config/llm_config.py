@@ -0,0 +1,42 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-pro")
+
+# Backend used for analysis: "gemini", or "fake" for offline tests and benchmarks
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
+FAKE_LLM_LATENCY = float(os.getenv("FAKE_LLM_LATENCY", "0"))  # seconds per fake call
+
+# Deadline for one LLM call, in seconds, including any hedged request
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+
+# Cheaper model on the same provider that races a slow primary call; empty disables hedging
+LLM_HEDGE_MODEL = os.getenv("LLM_HEDGE_MODEL", "gemini-2.5-flash")
+# Seconds before hedging until enough latencies are observed, then the percentile below is used
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "15"))
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+
+# Comma-separated "provider" or "provider:model" entries tried in order when the primary fails
+LLM_FALLBACK_PROVIDERS = os.getenv("LLM_FALLBACK_PROVIDERS", "")
+
+# Gemini calls in flight at once during bulk compression
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+
+# Applicants packed into one Gemini prompt during bulk compression; 1 sends one prompt per applicant
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "1"))
+
+# Ask the model for schema-constrained JSON instead of "Label: value" text
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() not in ("0", "false", "no")
+
+# What to do with the LLM for applicants the screening rules already rejected:
+# "analyze" (same as shortlisted), "skip", "defer" (after the rest of the run) or "cheap" (REJECTED_LLM_MODEL)
+REJECTED_LLM_POLICY = os.getenv("REJECTED_LLM_POLICY", "analyze")
+REJECTED_LLM_MODEL = os.getenv("REJECTED_LLM_MODEL", "gemini-2.5-flash-lite")
+
+# Persistent cache of LLM analyses keyed by prompt + model
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite3")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))  # seconds
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
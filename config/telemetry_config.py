@@ -0,0 +1,15 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Timers and counters around Airtable calls, LLM analysis, screening and the cell codec
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() not in ("0", "false", "no")
+
+# Summary written at the end of a CLI run: "json", "prometheus" or empty for none
+METRICS_FORMAT = os.getenv("METRICS_FORMAT", "")
+# File the summary is written to; empty logs it instead
+METRICS_FILE = os.getenv("METRICS_FILE", "")
+
+# Also record every timed operation as an OpenTelemetry span (needs opentelemetry-api and an SDK configured)
+METRICS_OTEL = os.getenv("METRICS_OTEL", "false").lower() not in ("0", "false", "no")
@@ -1,84 +1,350 @@
 import requests
-import json
 import logging
-from typing import List, Dict, Optional
-from config.airtable_config import HEADERS, BASE_ID
+import functools
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Iterator, Iterable, Callable, TypeVar
+from requests.adapters import HTTPAdapter
+from config.airtable_config import (
+    HEADERS,
+    BASE_ID,
+    API_URL,
+    POOL_SIZE,
+    MAX_WORKERS,
+    RATE_LIMIT,
+    MAX_RETRIES,
+    BACKOFF_BASE,
+    BACKOFF_MAX
+)
+from data_access.rate_limiter import RequestStats, backoff_delay, get_rate_limiter
+from telemetry.metrics import current_stage, get_metrics, in_stage
 
 logger = logging.getLogger(__name__)
 
+# Airtable caps list requests at 100 records per page
+MAX_PAGE_SIZE = 100
+# Multi-record create/update/delete endpoints accept at most 10 records per request
+MAX_BATCH_SIZE = 10
+
+# Status codes worth retrying; 429 is always safe to resend because Airtable rejected it unprocessed
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "PATCH", "DELETE"}
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def changed_fields(current: Dict, desired: Dict) -> Dict:
+    """The entries of ``desired`` whose values differ from a record's current ``fields``
+
+    Airtable leaves empty fields out of its responses, so None, "" and []
+    all match a field that is missing from ``current``.
+    """
+    return {name: value for name, value in desired.items() if _comparable(value) != _comparable(current.get(name))}
+
+
+def _comparable(value):
+    return None if value is None or value == "" or value == [] else value
+
+
+def _timed(method: Callable) -> Callable:
+    """Time a client operation under airtable_call_seconds, tagged with its name and table
+
+    Only single-request operations and batches are timed this way. Reads are
+    timed per page inside iter_records, and methods built from other timed
+    methods (fetch_records, upsert_record) are not timed again.
+    """
+    operation = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, table_name: str, *args, **kwargs):
+        with get_metrics().timer("airtable_call_seconds", operation=operation, table=table_name):
+            return method(self, table_name, *args, **kwargs)
+
+    return wrapper
+
 
 class AirtableClient:
     """Generic Airtable API client for CRUD operations"""
     
-    def __init__(self):
+    def __init__(self, pool_size: int = POOL_SIZE, max_workers: int = MAX_WORKERS, api_url: str = API_URL):
         self.headers = HEADERS
         self.base_id = BASE_ID
+        self.api_url = api_url.rstrip("/")
+        self.max_workers = max_workers
+
+        # One keep-alive session per client so calls reuse pooled TLS connections
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._worker_state = threading.local()
+
+        # Every client for the same base draws from one token bucket
+        self.rate_limiter = get_rate_limiter(self.base_id, RATE_LIMIT)
+        self.max_retries = MAX_RETRIES
+
+    @property
+    def stats(self) -> RequestStats:
+        """Queued, throttled and retried request counters for this base"""
+        return self.rate_limiter.stats
+
+    def table_url(self, table_name: str) -> str:
+        """Build the REST URL for a table"""
+        return f"{self.api_url}/{self.base_id}/{table_name}"
+
+    def map_concurrent(self, func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """Apply ``func`` to every item using the client's bounded worker pool
+
+        Results are returned in input order. At most ``max_workers`` calls are in
+        flight at once, and the first exception raised by a call is re-raised.
+        Calls made from inside a worker run inline so nested fan-outs cannot
+        deadlock the pool.
+        """
+        items = list(items)
+        if len(items) <= 1 or self.max_workers <= 1 or getattr(self._worker_state, "active", False):
+            return [func(item) for item in items]
+        # Workers record their metrics under the caller's stage
+        stage = current_stage()
+        return list(self._get_executor().map(lambda item: in_stage(stage, func, item), items))
+
+    def run_concurrently(self, *calls: Callable[[], R]) -> List[R]:
+        """Run independent zero-argument calls concurrently and return their results in order"""
+        return self.map_concurrent(lambda call: call(), calls)
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a rate-limited request, retrying 429s, 5xx errors and dropped connections
+
+        Waits honor ``Retry-After`` when Airtable sends it and otherwise use
+        jittered exponential backoff. The final response is returned as-is so
+        callers keep their own ``raise_for_status`` handling. Every attempt is
+        timed under airtable_request_seconds and the wait for a rate-limit
+        token under airtable_rate_limit_wait_seconds, both tagged by table.
+        """
+        stats = self.stats
+        metrics = get_metrics()
+        table = self._table_of(url)
+        attempt = 0
+        while True:
+            with metrics.timer("airtable_rate_limit_wait_seconds", table=table):
+                self.rate_limiter.acquire()
+            stats.increment("requests")
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                metrics.observe("airtable_request_seconds", time.perf_counter() - started,
+                                method=method, table=table, status="error")
+                if method not in IDEMPOTENT_METHODS or attempt >= self.max_retries:
+                    stats.increment("failed")
+                    raise
+                attempt += 1
+                delay = backoff_delay(attempt, BACKOFF_BASE, BACKOFF_MAX)
+                logger.warning(f"{method} {url} failed ({e}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            else:
+                status = response.status_code
+                metrics.observe("airtable_request_seconds", time.perf_counter() - started,
+                                method=method, table=table, status=status)
+                retryable = status == 429 or (status in RETRYABLE_STATUS and method in IDEMPOTENT_METHODS)
+                if not retryable:
+                    return response
+                if status == 429:
+                    stats.increment("throttled")
+                    metrics.increment("airtable_throttled_total", table=table)
+                if attempt >= self.max_retries:
+                    stats.increment("failed")
+                    return response
+                attempt += 1
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = backoff_delay(attempt, BACKOFF_BASE, BACKOFF_MAX)
+                if status == 429:
+                    # Hold back every thread sharing this base, not just this one
+                    self.rate_limiter.pause(delay)
+                logger.warning(f"{method} {url} returned {status}; retry {attempt}/{self.max_retries} in {delay:.1f}s")
+
+            stats.increment("retried")
+            time.sleep(delay)
+
+    def _table_of(self, url: str) -> str:
+        """Table name in a URL built by ``table_url``"""
+        prefix = self.table_url("")
+        return url[len(prefix):].split("/", 1)[0] if url.startswith(prefix) else "unknown"
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """Parse a Retry-After header given in seconds or as an HTTP date"""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def _mark_worker(self):
+        self._worker_state.active = True
+
+    def close(self):
+        """Release pooled connections and worker threads"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        self.session.close()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Lazily create the worker pool shared by all concurrent calls on this client"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="airtable",
+                    initializer=self._mark_worker
+                )
+            return self._executor
     
-    def fetch_records(self, table_name: str, filter_formula: Optional[str] = None) -> List[Dict]:
-        """Fetch records from an Airtable table"""
-        url = f"https://api.airtable.com/v0/{self.base_id}/{table_name}"
+    def iter_records(self, table_name: str, filter_formula: Optional[str] = None,
+                     fields: Optional[List[str]] = None, page_size: Optional[int] = None) -> Iterator[Dict]:
+        """Lazily yield records from an Airtable table, following pagination offsets
+
+        Pages are requested only as the caller consumes records, so memory stays
+        bounded by one page. ``fields`` limits the columns Airtable returns and
+        ``page_size`` (at most 100) sets the number of records per request.
+        Each page request is timed under airtable_call_seconds; time the caller
+        spends between pages is not.
+        """
+        url = self.table_url(table_name)
         params = {}
         if filter_formula:
             params["filterByFormula"] = filter_formula
-            
-        response = requests.get(url, headers=self.headers, params=params)
-        response.raise_for_status()
-        
-        return response.json().get("records", [])
-    
+        if fields:
+            params["fields[]"] = list(fields)
+        if page_size:
+            params["pageSize"] = min(page_size, MAX_PAGE_SIZE)
+
+        metrics = get_metrics()
+        pages = 0
+        while True:
+            with metrics.timer("airtable_call_seconds", operation="iter_records", table=table_name):
+                response = self._request("GET", url, params=params)
+                response.raise_for_status()
+                data = response.json()
+            pages += 1
+            records = data.get("records", [])
+            metrics.increment("airtable_records_read_total", len(records), table=table_name)
+            yield from records
+
+            offset = data.get("offset")
+            if not offset:
+                break
+            params["offset"] = offset
+
+        logger.debug(f"Read {pages} page(s) from {table_name}")
+
+    def fetch_records(self, table_name: str, filter_formula: Optional[str] = None,
+                      fields: Optional[List[str]] = None) -> List[Dict]:
+        """Fetch all matching records from an Airtable table"""
+        return list(self.iter_records(table_name, filter_formula, fields=fields))
+
+    @_timed
     def create_record(self, table_name: str, fields: Dict) -> Dict:
         """Create a new record in an Airtable table"""
-        url = f"https://api.airtable.com/v0/{self.base_id}/{table_name}"
+        url = self.table_url(table_name)
         payload = {"fields": fields}
         
-        response = requests.post(url, headers=self.headers, json=payload)
+        response = self._request("POST", url, json=payload)
         response.raise_for_status()
         
         return response.json()
     
+    @_timed
     def update_record(self, table_name: str, record_id: str, fields: Dict) -> Dict:
         """Update an existing record in an Airtable table"""
-        url = f"https://api.airtable.com/v0/{self.base_id}/{table_name}/{record_id}"
+        url = f"{self.table_url(table_name)}/{record_id}"
         payload = {"fields": fields}
         
-        response = requests.patch(url, headers=self.headers, json=payload)
-        logger.debug(f"Update request URL: {url}")
-        logger.debug(f"Update request payload: {payload}")
-        logger.debug(f"Update response status: {response.status_code}")
-        
-        try:
-            response.raise_for_status()
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP Error Details: {e}")
-            logger.error(f"Response content: {response.text}")
-            raise
-        
-        logger.debug(f"Update response text: {response.text}")
-        return response.json()
-        
+        response = self._request("PATCH", url, json=payload)
+        self._raise_for_status(response)
         return response.json()
     
+    @_timed
     def delete_record(self, table_name: str, record_id: str) -> Dict:
         """Delete a record from an Airtable table"""
-        url = f"https://api.airtable.com/v0/{self.base_id}/{table_name}/{record_id}"
+        url = f"{self.table_url(table_name)}/{record_id}"
         logger.info(f"Deleting record from {table_name} with ID: {record_id}")
-        logger.debug(f"Delete URL: {url}")
-        
-        response = requests.delete(url, headers=self.headers)
-        logger.debug(f"Delete response status: {response.status_code}")
         
+        response = self._request("DELETE", url)
+        self._raise_for_status(response)
+        return response.json()
+    
+    @_timed
+    def batch_create(self, table_name: str, fields_list: List[Dict]) -> List[Dict]:
+        """Create records through the multi-record endpoint, 10 per request"""
+        url = self.table_url(table_name)
+
+        def create_chunk(chunk: List[Dict]) -> List[Dict]:
+            response = self._request("POST", url, json={"records": [{"fields": fields} for fields in chunk]})
+            self._raise_for_status(response)
+            return response.json().get("records", [])
+
+        return self._run_batches(create_chunk, fields_list, f"Created {{}} record(s) in {table_name}")
+
+    @_timed
+    def batch_update(self, table_name: str, updates: List[Dict]) -> List[Dict]:
+        """Update records through the multi-record endpoint; each update is {"id": ..., "fields": {...}}"""
+        url = self.table_url(table_name)
+
+        def update_chunk(chunk: List[Dict]) -> List[Dict]:
+            payload = {"records": [{"id": update["id"], "fields": update["fields"]} for update in chunk]}
+            response = self._request("PATCH", url, json=payload)
+            self._raise_for_status(response)
+            return response.json().get("records", [])
+
+        return self._run_batches(update_chunk, updates, f"Updated {{}} record(s) in {table_name}")
+
+    @_timed
+    def batch_delete(self, table_name: str, record_ids: List[str]) -> List[Dict]:
+        """Delete records through the multi-record endpoint, 10 per request"""
+        url = self.table_url(table_name)
+
+        def delete_chunk(chunk: List[str]) -> List[Dict]:
+            response = self._request("DELETE", url, params={"records[]": chunk})
+            self._raise_for_status(response)
+            return response.json().get("records", [])
+
+        return self._run_batches(delete_chunk, record_ids, f"Deleted {{}} record(s) from {table_name}")
+
+    def _run_batches(self, send_chunk: Callable[[List], List[Dict]], items: List, message: str) -> List[Dict]:
+        """Split items into chunks of MAX_BATCH_SIZE, send them concurrently and flatten the results"""
+        items = list(items)
+        if not items:
+            return []
+        chunks = [items[i:i + MAX_BATCH_SIZE] for i in range(0, len(items), MAX_BATCH_SIZE)]
+        results = [record for chunk_result in self.map_concurrent(send_chunk, chunks) for record in chunk_result]
+        logger.info(message.format(len(results)) + f" in {len(chunks)} request(s)")
+        return results
+
+    @staticmethod
+    def _raise_for_status(response: requests.Response):
+        """Raise for HTTP errors, logging Airtable's error body first"""
         try:
             response.raise_for_status()
         except requests.exceptions.HTTPError as e:
             logger.error(f"HTTP Error Details: {e}")
             logger.error(f"Response content: {response.text}")
             raise
-        
-        logger.debug(f"Delete response text: {response.text}")
-        return response.json()
-        
-        return response.json()
-    
+
     def upsert_record(self, table_name: str, filter_formula: str, fields: Dict) -> Dict:
         """Upsert a record in an Airtable table"""
         records = self.fetch_records(table_name, filter_formula)
@@ -87,9 +353,26 @@ class AirtableClient:
         
         if records:
             record_id = records[0]["id"]
-            logger.info(f"Updating existing record with ID: {record_id}")
-            logger.debug(f"Record structure: {records[0]}")
-            return self.update_record(table_name, record_id, fields)
+            # Only fields that actually differ are sent, and nothing at all when none do
+            changes = changed_fields(records[0].get("fields", {}), fields)
+            if not changes:
+                logger.info(f"Record {record_id} is already up to date")
+                return records[0]
+            logger.info(f"Updating {len(changes)} changed field(s) of existing record with ID: {record_id}")
+            return self.update_record(table_name, record_id, changes)
         else:
             logger.info("Creating new record")
             return self.create_record(table_name, fields)
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_client() -> AirtableClient:
+    """Return the process-wide AirtableClient so every repository shares one connection pool"""
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = AirtableClient()
+        return _shared_client
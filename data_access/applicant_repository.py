@@ -1,5 +1,8 @@
-from typing import List, Dict, Optional
-from data_access.airtable_client import AirtableClient
+import requests
+import threading
+from typing import List, Dict, Optional, Iterable, Sequence
+from data_access.airtable_client import AirtableClient, changed_fields, get_shared_client
+from data_access.record_index import LinkedRecordIndex, get_shared_index
 import json
 import logging
 from config.airtable_config import (
@@ -7,111 +10,252 @@ from config.airtable_config import (
     TABLE_EXPERIENCE, 
     TABLE_SALARY, 
     APPLICANTS_TABLE, 
-    SHORTLISTED_TABLE
+    SHORTLISTED_TABLE,
+    PERSONAL_RECORD_ID_FIELD,
+    APPLICANT_RECORD_ID_FIELD,
+    CONTENT_HASH_FIELD
 )
 from models.applicant import Applicant, PersonalInfo, WorkExperience, SalaryPreferences
 
 logger = logging.getLogger(__name__)
 
+# Columns read from each source table, requested via fields[] to keep scans small
+PERSONAL_FIELDS = ["ApplicantId", "Full Name", "Email", "Location", "LinkedIn"]
+EXPERIENCE_FIELDS = ["Personal Details", "Company", "Title", "Start", "End", "Technologies"]
+SALARY_FIELDS = ["Personal Details", "Preferred Rate", "Minimum Rate", "Currency", "Availability (hrs/wk)"]
+
+# ApplicantIds per OR(...) formula in batched reads, keeping request URLs well under Airtable's limit
+OR_QUERY_CHUNK_SIZE = 50
+
+
+def _id_text(value) -> Optional[str]:
+    """An ApplicantId as text, so the 7 or 7.0 a number field returns matches the ID "7" we send"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return None if value is None else str(value)
+
+
 class ApplicantRepository:
     """Repository for accessing applicant data from Airtable"""
     
-    def __init__(self):
-        self.client = AirtableClient()
+    def __init__(self, client: Optional[AirtableClient] = None, index: Optional[LinkedRecordIndex] = None):
+        self.client = client or get_shared_client()
+        # Optional local map of ApplicantId -> record IDs that lets writes skip lookup requests
+        self.index = index if index is not None else get_shared_index()
+        # Tables found to lack the record-ID lookup field; these fall back to a full scan
+        self._tables_without_lookup = set()
+        # Set once Airtable reports that Applicants has no content-hash field; hashes are then not written
+        self._content_hash_missing = False
+        self._content_hash_lock = threading.Lock()
     
     def get_personal_info(self, applicant_id: str) -> Optional[PersonalInfo]:
         """Get personal info for an applicant"""
-        # Check if ApplicantId is numeric
-        try:
-            numeric_id = int(applicant_id)
-            filter_formula = f"{{ApplicantId}} = {numeric_id}"
-        except ValueError:
-            # If not numeric, use string format
-            filter_formula = f"{{ApplicantId}} = '{applicant_id}'"
+        filter_formula = self._id_equals("ApplicantId", applicant_id)
         
         records = self.client.fetch_records(TABLE_PERSONAL, filter_formula)
         
         if not records:
             return None
             
-        fields = records[0]["fields"]
-        return PersonalInfo(
-            name=fields.get("Full Name"),
-            email=fields.get("Email"),
-            location=fields.get("Location"),
-            linkedin=fields.get("LinkedIn")
-        )
+        return self._personal_from_fields(records[0]["fields"])
     
     def get_work_experience(self, applicant_id: str) -> List[WorkExperience]:
         """Get work experience for an applicant"""
-        # Check if applicant_id is numeric
-        try:
-            numeric_id = int(applicant_id)
-            filter_formula = f"{{Personal Details}} = {numeric_id}"
-        except ValueError:
-            # If not numeric, use string format
-            filter_formula = f"{{Personal Details}} = '{applicant_id}'"
+        filter_formula = self._id_equals("Personal Details", applicant_id)
         
         records = self.client.fetch_records(TABLE_EXPERIENCE, filter_formula)
         
-        experience_list = []
-        for record in records:
-            fields = record["fields"]
-            experience = WorkExperience(
-                company=fields.get("Company"),
-                title=fields.get("Title"),
-                start=fields.get("Start"),
-                end=fields.get("End"),
-                technologies=fields.get("Technologies")
-            )
-            experience_list.append(experience)
-            
-        return experience_list
+        return [self._experience_from_fields(record["fields"]) for record in records]
     
     def get_salary_preferences(self, applicant_id: str) -> SalaryPreferences:
         """Get salary preferences for an applicant"""
-        # Check if applicant_id is numeric
-        try:
-            numeric_id = int(applicant_id)
-            filter_formula = f"{{Personal Details}} = {numeric_id}"
-        except ValueError:
-            # If not numeric, use string format
-            filter_formula = f"{{Personal Details}} = '{applicant_id}'"
+        filter_formula = self._id_equals("Personal Details", applicant_id)
         
         records = self.client.fetch_records(TABLE_SALARY, filter_formula)
         
-        salary_data = SalaryPreferences()
-        if records:
-            fields = records[0]["fields"]
-            salary_data = SalaryPreferences(
-                preferred_rate=fields.get("Preferred Rate"),
-                minimum_rate=fields.get("Minimum Rate"),
-                currency=fields.get("Currency"),
-                availability=fields.get("Availability (hrs/wk)")
-            )
-            
-        return salary_data
+        if not records:
+            return SalaryPreferences()
+
+        return self._salary_from_fields(records[0]["fields"])
     
     def get_applicant(self, applicant_id: str) -> Optional[Applicant]:
-        """Get complete applicant data"""
-        personal = self.get_personal_info(applicant_id)
+        """Get complete applicant data, reading the three tables concurrently"""
+        personal, experience, salary = self.client.run_concurrently(
+            lambda: self.get_personal_info(applicant_id),
+            lambda: self.get_work_experience(applicant_id),
+            lambda: self.get_salary_preferences(applicant_id)
+        )
         if not personal:
             return None
-            
-        experience = self.get_work_experience(applicant_id)
-        salary = self.get_salary_preferences(applicant_id)
         
-        return Applicant(personal=personal, experience=experience, salary=salary)
+        return Applicant(personal=personal, experience=tuple(experience), salary=salary)
+
+    def get_applicants(self, applicant_ids: Iterable[str]) -> Dict[str, Applicant]:
+        """Get complete applicant data for many applicants with one OR query per table
+
+        IDs are split into chunks of OR_QUERY_CHUNK_SIZE to keep formulas within
+        Airtable's URL limits, and every table/chunk query runs concurrently.
+        Applicants without a Personal Details row are left out of the result.
+        """
+        ids = list(dict.fromkeys(str(applicant_id) for applicant_id in applicant_ids))
+        if not ids:
+            return {}
+
+        queries = []
+        for i in range(0, len(ids), OR_QUERY_CHUNK_SIZE):
+            chunk = ids[i:i + OR_QUERY_CHUNK_SIZE]
+            personal_formula = "OR(" + ", ".join(self._id_equals("ApplicantId", applicant_id) for applicant_id in chunk) + ")"
+            linked_formula = "OR(" + ", ".join(self._id_equals("Personal Details", applicant_id) for applicant_id in chunk) + ")"
+            queries.append((TABLE_PERSONAL, personal_formula, PERSONAL_FIELDS))
+            queries.append((TABLE_EXPERIENCE, linked_formula, EXPERIENCE_FIELDS))
+            queries.append((TABLE_SALARY, linked_formula, SALARY_FIELDS))
+
+        results = self.client.map_concurrent(
+            lambda query: (query[0], self.client.fetch_records(query[0], query[1], fields=query[2])),
+            queries
+        )
+        records_by_table = {TABLE_PERSONAL: [], TABLE_EXPERIENCE: [], TABLE_SALARY: []}
+        for table_name, records in results:
+            records_by_table[table_name].extend(records)
+
+        return self._group_applicants(
+            records_by_table[TABLE_PERSONAL],
+            records_by_table[TABLE_EXPERIENCE],
+            records_by_table[TABLE_SALARY],
+            set(ids)
+        )
+
+    def list_applicant_ids(self) -> List[str]:
+        """List every ApplicantId in Personal Details with a projected scan"""
+        return [
+            str(record["fields"]["ApplicantId"])
+            for record in self.client.iter_records(TABLE_PERSONAL, fields=["ApplicantId"])
+            if record.get("fields", {}).get("ApplicantId") is not None
+        ]
+
+    def get_all_applicants(self, applicant_ids: Optional[Iterable[str]] = None) -> Dict[str, Applicant]:
+        """Get complete applicant data for many applicants using one paginated scan per table"""
+        wanted = {str(applicant_id) for applicant_id in applicant_ids} if applicant_ids is not None else None
+
+        # Child tables are streamed page by page; only rows for wanted applicants are kept
+        return self._group_applicants(
+            self.client.iter_records(TABLE_PERSONAL, fields=PERSONAL_FIELDS),
+            self.client.iter_records(TABLE_EXPERIENCE, fields=EXPERIENCE_FIELDS),
+            self.client.iter_records(TABLE_SALARY, fields=SALARY_FIELDS),
+            wanted
+        )
+
+    def _group_applicants(self, personal_records: Iterable[Dict], experience_records: Iterable[Dict],
+                          salary_records: Iterable[Dict], wanted: Optional[set]) -> Dict[str, Applicant]:
+        """Group Personal Details, Work Experience and Salary Preferences rows into Applicants
+
+        Personal Details rows are consumed first to map record IDs to ApplicantIds,
+        so the child iterables may be lazy scans.
+        """
+        # Map Personal Details record IDs to ApplicantIds so child rows can be grouped
+        applicant_by_record = {}
+        personal_by_applicant = {}
+        for record in personal_records:
+            applicant_id = record.get("fields", {}).get("ApplicantId")
+            if applicant_id is None:
+                continue
+            applicant_id = str(applicant_id)
+            if wanted is not None and applicant_id not in wanted:
+                continue
+            if applicant_id in personal_by_applicant:
+                logger.warning(f"Duplicate Personal Details rows for applicant {applicant_id}; keeping the first")
+                continue
+            applicant_by_record[record["id"]] = applicant_id
+            personal_by_applicant[applicant_id] = self._personal_from_fields(record["fields"])
+            if self.index:
+                self.index.set_parent(TABLE_PERSONAL, applicant_id, record, PERSONAL_FIELDS)
+
+        experience_by_applicant = {applicant_id: [] for applicant_id in personal_by_applicant}
+        experience_rows = []
+        for record in experience_records:
+            for personal_record_id in record.get("fields", {}).get("Personal Details", []):
+                applicant_id = applicant_by_record.get(personal_record_id)
+                if applicant_id is not None:
+                    experience_by_applicant[applicant_id].append(self._experience_from_fields(record["fields"]))
+                    experience_rows.append(record)
+
+        salary_by_applicant = {}
+        salary_rows = []
+        for record in salary_records:
+            for personal_record_id in record.get("fields", {}).get("Personal Details", []):
+                applicant_id = applicant_by_record.get(personal_record_id)
+                if applicant_id is not None:
+                    salary_rows.append(record)
+                    if applicant_id not in salary_by_applicant:
+                        salary_by_applicant[applicant_id] = self._salary_from_fields(record["fields"])
+
+        # The queries returned every child row of these parents, so the index can trust them as complete
+        if self.index:
+            self.index.sync_children(TABLE_EXPERIENCE, experience_rows, applicant_by_record, EXPERIENCE_FIELDS)
+            self.index.sync_children(TABLE_SALARY, salary_rows, applicant_by_record, SALARY_FIELDS)
+
+        logger.info(f"Grouped {len(personal_by_applicant)} applicant(s)")
+
+        return {
+            applicant_id: Applicant(
+                personal=personal,
+                experience=tuple(experience_by_applicant[applicant_id]),
+                salary=salary_by_applicant.get(applicant_id, SalaryPreferences())
+            )
+            for applicant_id, personal in personal_by_applicant.items()
+        }
+
+    @staticmethod
+    def _id_equals(field: str, applicant_id: str) -> str:
+        """Formula comparing a field to an ApplicantId, unquoted when the ID is numeric"""
+        try:
+            return f"{{{field}}} = {int(applicant_id)}"
+        except ValueError:
+            return f"{{{field}}} = '{applicant_id}'"
+
+    @staticmethod
+    def _personal_from_fields(fields: Dict) -> PersonalInfo:
+        """Build PersonalInfo from a Personal Details record's fields"""
+        return PersonalInfo(
+            name=fields.get("Full Name"),
+            email=fields.get("Email"),
+            location=fields.get("Location"),
+            linkedin=fields.get("LinkedIn")
+        )
+
+    @staticmethod
+    def _experience_from_fields(fields: Dict) -> WorkExperience:
+        """Build WorkExperience from a Work Experience record's fields"""
+        return WorkExperience(
+            company=fields.get("Company"),
+            title=fields.get("Title"),
+            start=fields.get("Start"),
+            end=fields.get("End"),
+            technologies=fields.get("Technologies")
+        )
+
+    @staticmethod
+    def _salary_from_fields(fields: Dict) -> SalaryPreferences:
+        """Build SalaryPreferences from a Salary Preferences record's fields"""
+        return SalaryPreferences(
+            preferred_rate=fields.get("Preferred Rate"),
+            minimum_rate=fields.get("Minimum Rate"),
+            currency=fields.get("Currency"),
+            availability=fields.get("Availability (hrs/wk)")
+        )
     
     def save_compressed_applicant(self, applicant_id: str, compressed_json: str, 
                                 shortlist_status: str, llm_score: Optional[int], 
-                                llm_summary: Optional[str], llm_follow_ups: Optional[str]) -> Dict:
+                                llm_summary: Optional[str], llm_follow_ups: Optional[str],
+                                content_hash: Optional[str] = None) -> Dict:
         """Save compressed applicant data to Applicants table"""
         fields = {
             "ApplicantId": str(applicant_id),
             "Compressed JSON": compressed_json,
             "Shortlist Status": shortlist_status,
         }
+        if content_hash and not self._content_hash_missing:
+            fields[CONTENT_HASH_FIELD] = content_hash
         
         if llm_score is not None:
             fields["LLM Score"] = llm_score
@@ -120,60 +264,107 @@ class ApplicantRepository:
         if llm_follow_ups:
             fields["LLM Follow Ups"] = llm_follow_ups
             
-        filter_formula = f'{{ApplicantId}} = "{applicant_id}"'
-        return self.client.upsert_record(APPLICANTS_TABLE, filter_formula, fields)
+        filter_formula = self._id_equals("ApplicantId", applicant_id)
+        try:
+            return self._upsert_parent(APPLICANTS_TABLE, applicant_id, filter_formula, fields)
+        except requests.exceptions.HTTPError as e:
+            if CONTENT_HASH_FIELD not in fields or not self._is_unknown_field_error(e, CONTENT_HASH_FIELD):
+                raise
+            self._warn_content_hash_missing()
+            del fields[CONTENT_HASH_FIELD]
+            return self._upsert_parent(APPLICANTS_TABLE, applicant_id, filter_formula, fields)
+
+    def _warn_content_hash_missing(self):
+        # Concurrent saves can all hit the missing field before the first one records it
+        with self._content_hash_lock:
+            if not self._content_hash_missing:
+                logger.warning(f"{APPLICANTS_TABLE} has no '{CONTENT_HASH_FIELD}' field; content hashes are not "
+                               f"stored and compress-changed treats every applicant as changed")
+            self._content_hash_missing = True
     
+    def get_content_hashes(self) -> Dict[str, str]:
+        """Map each ApplicantId in Applicants to its stored content hash, with one projected scan"""
+        hashes = {}
+        try:
+            for record in self.client.iter_records(APPLICANTS_TABLE, fields=["ApplicantId", CONTENT_HASH_FIELD]):
+                fields = record.get("fields", {})
+                if fields.get("ApplicantId") is not None and fields.get(CONTENT_HASH_FIELD):
+                    hashes[str(fields["ApplicantId"])] = fields[CONTENT_HASH_FIELD]
+        except requests.exceptions.HTTPError as e:
+            if not self._is_unknown_field_error(e, CONTENT_HASH_FIELD):
+                raise
+            self._warn_content_hash_missing()
+            return {}
+        return hashes
+
+    def get_compressed_applicants(self, applicant_ids: Optional[Iterable[str]] = None) -> Dict[str, Optional[str]]:
+        """Map ApplicantIds to their "Compressed JSON" cells
+
+        Every Applicants row is read in one paginated scan when ``applicant_ids``
+        is None; otherwise the IDs are read with concurrent chunked OR queries.
+        """
+        fields = ["ApplicantId", "Compressed JSON"]
+        if applicant_ids is None:
+            wanted = None
+            records = self.client.iter_records(APPLICANTS_TABLE, fields=fields)
+        else:
+            ids = list(dict.fromkeys(str(applicant_id) for applicant_id in applicant_ids))
+            wanted = set(ids)
+            formulas = [
+                "OR(" + ", ".join(self._id_equals("ApplicantId", applicant_id)
+                                  for applicant_id in ids[i:i + OR_QUERY_CHUNK_SIZE]) + ")"
+                for i in range(0, len(ids), OR_QUERY_CHUNK_SIZE)
+            ]
+            records = [
+                record
+                for chunk in self.client.map_concurrent(
+                    lambda formula: self.client.fetch_records(APPLICANTS_TABLE, formula, fields=fields), formulas
+                )
+                for record in chunk
+            ]
+
+        cells = {}
+        for record in records:
+            applicant_id = record.get("fields", {}).get("ApplicantId")
+            if applicant_id is None:
+                continue
+            applicant_id = str(applicant_id)
+            if wanted is not None and applicant_id not in wanted:
+                continue
+            if applicant_id in cells:
+                logger.warning(f"Duplicate Applicants rows for applicant {applicant_id}; keeping the first")
+                continue
+            cells[applicant_id] = record["fields"].get("Compressed JSON")
+            if self.index:
+                self.index.set_parent(APPLICANTS_TABLE, applicant_id, record, fields)
+        return cells
+
     def get_compressed_applicant(self, applicant_id: str) -> Optional[Dict]:
         """Get compressed applicant JSON from Applicants table"""
-        # Check if ApplicantId is numeric
-        try:
-            numeric_id = int(applicant_id)
-            filter_formula = f"{{ApplicantId}} = {numeric_id}"
-        except ValueError:
-            # If not numeric, use string format
-            filter_formula = f"{{ApplicantId}} = '{applicant_id}'"
+        filter_formula = self._id_equals("ApplicantId", applicant_id)
         
         records = self.client.fetch_records(APPLICANTS_TABLE, filter_formula)
         
         if not records:
             return None
-            
+
+        if self.index:
+            self.index.set_parent(APPLICANTS_TABLE, applicant_id, records[0])
         return records[0]
     
     def save_shortlisted_lead(self, applicant_record_id: str, compressed_json: str, reason: str) -> Dict:
         """Save shortlisted lead to Shortlisted Leads table"""
-        # Fetch all records with linked Applicants
-        existing_records = self.client.fetch_records(
-            SHORTLISTED_TABLE, 
-            f"COUNTA({{Applicants}}) > 0"
-        )
-        
-        logger.info(f"Found {len(existing_records)} shortlisted lead records with linked Applicants")
-        
-        # Filter further to only get records linked to our specific applicant_record_id
-        records_to_delete = []
-        for record in existing_records:
-            applicants_field = record.get('fields', {}).get('Applicants', [])
-            if applicant_record_id in applicants_field or applicant_record_id in [str(id) for id in applicants_field]:
-                records_to_delete.append(record)
-                
-        logger.info(f"Checking existing shortlisted records for: {applicant_record_id}")
-        logger.info(f"Found: {len(records_to_delete)} records to delete")
-
-        # Delete existing records
-        for record in records_to_delete:
-            record_id = record["id"]
-            logger.info(f"Deleting shortlisted lead record: {record_id}")
-            self.client.delete_record(SHORTLISTED_TABLE, record_id)
-            
         fields = {
             "Applicants": [applicant_record_id],
             "Compressed JSON": compressed_json,
             "Score Reason": reason
         }
         
-        logger.info("Creating new shortlisted lead record")
-        return self.client.create_record(SHORTLISTED_TABLE, fields)
+        logger.info("Syncing shortlisted lead record")
+        records = self._sync_linked_records(
+            SHORTLISTED_TABLE, "Applicants", APPLICANT_RECORD_ID_FIELD, applicant_record_id, [fields]
+        )
+        return records[0]
     
     def save_personal_info(self, applicant_id: str, personal_info: PersonalInfo) -> Dict:
         """Save personal info to Personal Details table"""
@@ -184,40 +375,15 @@ class ApplicantRepository:
             "LinkedIn": personal_info.linkedin
         }
         
-        # Check if ApplicantId is numeric
-        try:
-            numeric_id = int(applicant_id)
-            filter_formula = f"{{ApplicantId}} = {numeric_id}"
-        except ValueError:
-            # If not numeric, use string format
-            filter_formula = f"{{ApplicantId}} = '{applicant_id}'"
+        filter_formula = self._id_equals("ApplicantId", applicant_id)
         
-        return self.client.upsert_record(TABLE_PERSONAL, filter_formula, fields)
+        return self._upsert_parent(TABLE_PERSONAL, applicant_id, filter_formula, fields)
     
-    def save_work_experience(self, personal_id: str, experience_list: List[WorkExperience]) -> List[Dict]:
+    def save_work_experience(self, personal_id: str, experience_list: Sequence[WorkExperience]) -> List[Dict]:
         """Save work experience to Work Experience table"""
-        created_records = []
-        
-        # Clear existing records by finding records linked to this personal_id
-        # Using COUNTA to check if the linked field array contains the personal_id
-        existing_records = self.client.fetch_records(TABLE_EXPERIENCE, f"COUNTA({{Personal Details}}) > 0")
-        logger.info(f"Found {len(existing_records)} work experience records with linked Personal Details")
-        
-        # Filter further to only get records linked to our specific personal_id
-        records_to_delete = []
-        for record in existing_records:
-            personal_details_field = record.get('fields', {}).get('Personal Details', [])
-            if personal_id in personal_details_field or personal_id in [str(id) for id in personal_details_field]:
-                records_to_delete.append(record)
-                
-        logger.info(f"Found {len(records_to_delete)} existing work experience records to delete")
-        for record in records_to_delete:
-            logger.info(f"Deleting work experience record: {record['id']}")
-            self.client.delete_record(TABLE_EXPERIENCE, record["id"])
-        
-        # Create new records
-        for exp in experience_list:
-            fields = {
+        # Diff against the rows linked to this personal_id; only changed rows are written, up to 10 per request
+        fields_list = [
+            {
                 "Company": exp.company,
                 "Title": exp.title,
                 "Start": exp.start,
@@ -225,12 +391,14 @@ class ApplicantRepository:
                 "Technologies": exp.technologies,
                 "Personal Details": [personal_id]
             }
+            for exp in experience_list
+        ]
+        records = self._sync_linked_records(
+            TABLE_EXPERIENCE, "Personal Details", PERSONAL_RECORD_ID_FIELD, personal_id, fields_list
+        )
             
-            record = self.client.create_record(TABLE_EXPERIENCE, fields)
-            created_records.append(record)
-            
-        logger.info(f"Cleared and created {len(created_records)} work experience record(s).")
-        return created_records
+        logger.info(f"Synced {len(records)} work experience record(s).")
+        return records
     
     def save_salary_preferences(self, personal_id: str, salary_data: SalaryPreferences) -> Dict:
         """Save salary preferences to Salary Preferences table"""
@@ -242,39 +410,206 @@ class ApplicantRepository:
             "Personal Details": [personal_id]
         }
         
-        # Clear existing records by finding records linked to this personal_id
-        # Using COUNTA to check if the linked field array contains the personal_id
-        existing_records = self.client.fetch_records(TABLE_SALARY, f"COUNTA({{Personal Details}}) > 0")
-        logger.info(f"Found {len(existing_records)} salary preference records with linked Personal Details")
-        
-        # Filter further to only get records linked to our specific personal_id
-        records_to_delete = []
-        for record in existing_records:
-            personal_details_field = record.get('fields', {}).get('Personal Details', [])
-            if personal_id in personal_details_field or personal_id in [str(id) for id in personal_details_field]:
-                records_to_delete.append(record)
-                
-        logger.info(f"Found {len(records_to_delete)} existing salary preference records to delete")
-        for record in records_to_delete:
-            logger.info(f"Deleting salary preference record: {record['id']}")
-            self.client.delete_record(TABLE_SALARY, record["id"])
-        
-        logger.info(f"Cleared {len(existing_records)} salary preference record(s).")
-        
-        return self.client.create_record(TABLE_SALARY, fields)
-        
-        # # Filter further to only get records linked to our specific personal_id
-        # records_to_delete = []
-        # for record in existing_records:
-        #     personal_details_field = record.get('fields', {}).get('Personal Details', [])
-        #     if personal_id in personal_details_field or personal_id in [str(id) for id in personal_details_field]:
-        #         records_to_delete.append(record)
-                
-        # logger.info(f"Found {len(records_to_delete)} existing salary preference records to delete")
-        # for record in records_to_delete:
-        #     logger.info(f"Deleting salary preference record: {record['id']}")
-        #     self.client.delete_record(TABLE_SALARY, record["id"])
-        
-        # logger.info(f"Cleared {len(existing_records)} salary preference record(s).")
-        
-        # return self.client.create_record(TABLE_SALARY, fields)
+        # Diff against the row linked to this personal_id and write it only if it changed
+        records = self._sync_linked_records(
+            TABLE_SALARY, "Personal Details", PERSONAL_RECORD_ID_FIELD, personal_id, [fields]
+        )
+        return records[0]
+
+    def _upsert_parent(self, table_name: str, applicant_id: str, filter_formula: str, fields: Dict) -> Dict:
+        """Upsert a Personal Details or Applicants row, sending only the fields that changed
+
+        When the index knows the record and the values of every field being
+        written, the diff is made against those with no read at all. Otherwise
+        the row is read by record ID (index hit) or with ``filter_formula``.
+        """
+        indexed = self.index.get_parent_record(table_name, applicant_id) if self.index else None
+        if indexed is not None and self._knows_fields(indexed, fields):
+            try:
+                return self._update_parent(table_name, applicant_id, indexed, fields)
+            except requests.exceptions.HTTPError as e:
+                if not self._is_stale_record_error(e):
+                    raise
+                logger.warning(f"Indexed {table_name} record {indexed['id']} no longer exists; looking it up")
+                self.index.forget_parent(table_name, applicant_id)
+
+        record = self._current_parent(table_name, applicant_id, filter_formula, list(fields))
+        if record is not None:
+            return self._update_parent(table_name, applicant_id, record, fields)
+        logger.info(f"Creating new {table_name} record for applicant {applicant_id}")
+        record = self.client.create_record(table_name, fields)
+        if self.index:
+            self.index.set_parent(table_name, applicant_id, record, fields)
+        return record
+
+    def _update_parent(self, table_name: str, applicant_id: str, record: Dict, fields: Dict) -> Dict:
+        """PATCH the fields of ``record`` that differ from ``fields``, or nothing when none do"""
+        changes = self._changed_parent_fields(record.get("fields", {}), fields)
+        if changes:
+            logger.info(f"Updating {len(changes)} changed field(s) of {table_name} record {record['id']}")
+            record = self.client.update_record(table_name, record["id"], changes)
+        else:
+            logger.info(f"{table_name} record {record['id']} is already up to date")
+        if self.index:
+            self.index.set_parent(table_name, applicant_id, record, fields)
+        return record
+
+    def _current_parent(self, table_name: str, applicant_id: str, filter_formula: str,
+                        fields: List[str]) -> Optional[Dict]:
+        """Read an applicant's Personal Details or Applicants row with ``fields``, or None if it has none"""
+        record_id = self.index.get_parent(table_name, applicant_id) if self.index else None
+        if record_id:
+            records = self.client.fetch_records(table_name, f"RECORD_ID() = '{record_id}'", fields=fields)
+            if records:
+                return records[0]
+            logger.warning(f"Indexed {table_name} record {record_id} no longer exists; looking it up")
+            self.index.forget_parent(table_name, applicant_id)
+        records = self.client.fetch_records(table_name, filter_formula, fields=fields)
+        return records[0] if records else None
+
+    @staticmethod
+    def _knows_fields(record: Dict, fields: Iterable[str]) -> bool:
+        """Whether an indexed record holds known values for every field in ``fields``"""
+        known = record.get("fields", {})
+        return all(name in known for name in fields)
+
+    @staticmethod
+    def _changed_parent_fields(current: Dict, fields: Dict) -> Dict:
+        """changed_fields, with ApplicantId compared as text on both sides since it may be a number field"""
+        if "ApplicantId" in fields:
+            current = {**current, "ApplicantId": _id_text(current.get("ApplicantId"))}
+            fields = {**fields, "ApplicantId": _id_text(fields["ApplicantId"])}
+        return changed_fields(current, fields)
+
+    def _sync_linked_records(self, table_name: str, link_field: str, lookup_field: str,
+                             parent_record_id: str, fields_list: List[Dict]) -> List[Dict]:
+        """Make the rows linked to a parent record match ``fields_list``, writing only what differs
+
+        Current rows identical to a desired row are left alone. Remaining desired
+        rows are PATCHed onto the remaining current rows with just their changed
+        fields, and any surplus is created or deleted, so unchanged data costs
+        a single read. Returns the linked records in ``fields_list`` order.
+        """
+        try:
+            return self._apply_linked_diff(table_name, parent_record_id, fields_list,
+                                           self._current_linked_records(table_name, link_field, lookup_field,
+                                                                        parent_record_id, fields_list))
+        except requests.exceptions.HTTPError as e:
+            if not self.index or not self._is_stale_record_error(e):
+                raise
+            # Rows changed since they were read; look them up again and redo the diff once
+            logger.warning(f"{table_name} rows for {parent_record_id} changed during the update; retrying")
+            self.index.forget_children(table_name, parent_record_id)
+            return self._apply_linked_diff(table_name, parent_record_id, fields_list,
+                                           self._current_linked_records(table_name, link_field, lookup_field,
+                                                                        parent_record_id, fields_list))
+
+    def _apply_linked_diff(self, table_name: str, parent_record_id: str, fields_list: List[Dict],
+                           current: List[Dict]) -> List[Dict]:
+        unmatched = list(current)
+        records: List[Optional[Dict]] = [None] * len(fields_list)
+        pending = []
+        for i, fields in enumerate(fields_list):
+            match = next((record for record in unmatched if not changed_fields(record.get("fields", {}), fields)), None)
+            if match is None:
+                pending.append(i)
+            else:
+                unmatched.remove(match)
+                records[i] = match
+
+        updates = [
+            {"id": record["id"], "fields": changed_fields(record.get("fields", {}), fields_list[i])}
+            for i, record in zip(pending, unmatched)
+        ]
+        to_create = pending[len(updates):]
+        to_delete = [record["id"] for record in unmatched[len(updates):]]
+
+        updated = self.client.batch_update(table_name, updates)
+        created = self.client.batch_create(table_name, [fields_list[i] for i in to_create])
+        self.client.batch_delete(table_name, to_delete)
+        for i, record in zip(pending, updated + created):
+            records[i] = record
+
+        logger.info(f"{table_name}: {len(fields_list) - len(pending)} unchanged, {len(updated)} updated, "
+                    f"{len(created)} created, {len(to_delete)} deleted")
+        if self.index:
+            # Every record here was read with, or written in full from, the desired fields
+            self.index.replace_children(table_name, parent_record_id, records, self._field_names(fields_list))
+        return records
+
+    def _current_linked_records(self, table_name: str, link_field: str, lookup_field: str,
+                                parent_record_id: str, fields_list: List[Dict]) -> List[Dict]:
+        """Read the rows linked to a parent, with every field the desired rows set
+
+        Indexed rows whose values for those fields are all known are returned
+        from the index without a request; other indexed rows are read by
+        record ID. If any of them is gone, the index entry is dropped and the
+        rows are looked up through the link instead.
+        """
+        fields = self._field_names(fields_list, link_field)
+        indexed = self.index.get_children_records(table_name, parent_record_id) if self.index else None
+        if indexed is not None:
+            if all(self._knows_fields(record, fields) for record in indexed):
+                return indexed
+            record_ids = [record["id"] for record in indexed]
+            formula = "OR(" + ", ".join(f"RECORD_ID() = '{record_id}'" for record_id in record_ids) + ")"
+            records = self.client.fetch_records(table_name, formula, fields=fields)
+            if len(records) == len(record_ids):
+                return records
+            logger.warning(f"Indexed {table_name} rows for {parent_record_id} are stale; looking them up")
+            self.index.forget_children(table_name, parent_record_id)
+        return self._find_linked_records(table_name, link_field, lookup_field, parent_record_id, fields)
+
+    @staticmethod
+    def _field_names(fields_list: List[Dict], link_field: Optional[str] = None) -> List[str]:
+        """Every field set by any of the desired rows, after ``link_field`` when given"""
+        return list(dict.fromkeys(([link_field] if link_field else []) + [name for row in fields_list for name in row]))
+
+    @staticmethod
+    def _is_stale_record_error(error: requests.exceptions.HTTPError) -> bool:
+        """Whether Airtable rejected a request because a referenced record no longer exists"""
+        return (error.response is not None and error.response.status_code in (404, 422)
+                and "UNKNOWN_FIELD_NAME" not in error.response.text)
+
+    @staticmethod
+    def _is_unknown_field_error(error: requests.exceptions.HTTPError, field: str) -> bool:
+        """Whether Airtable answered 422 because ``field`` does not exist in the table"""
+        return (error.response is not None and error.response.status_code == 422
+                and "UNKNOWN_FIELD_NAME" in error.response.text and field in error.response.text)
+
+    def _find_linked_records(self, table_name: str, link_field: str, lookup_field: str, linked_id: str,
+                             fields: Optional[List[str]] = None) -> List[Dict]:
+        """Find records whose link field points at ``linked_id``, reading ``fields`` (default: the link only)
+
+        Airtable filters on ``lookup_field`` (a lookup of the linked record's
+        RECORD_ID()), so only that parent's rows are returned no matter how
+        large the table is. Bases without the lookup field fall back to a
+        streamed scan of every linked row.
+        """
+        fields = fields or [link_field]
+        if table_name in self._tables_without_lookup:
+            records = self._scan_linked_records(table_name, link_field, fields)
+        else:
+            formula = f"FIND('{linked_id}', ARRAYJOIN({{{lookup_field}}}))"
+            try:
+                records = self.client.fetch_records(table_name, formula, fields=fields)
+            except requests.exceptions.HTTPError as e:
+                # 422 means the formula references an unknown field
+                if e.response is None or e.response.status_code != 422:
+                    raise
+                logger.warning(f"{table_name} has no '{lookup_field}' lookup field; "
+                               f"falling back to scanning every linked record")
+                self._tables_without_lookup.add(table_name)
+                records = self._scan_linked_records(table_name, link_field, fields)
+
+        # FIND matches substrings, so confirm the link itself before acting on a row
+        matches = [
+            record for record in records
+            if any(str(record_id) == linked_id for record_id in record.get("fields", {}).get(link_field, []))
+        ]
+        logger.info(f"Found {len(matches)} {table_name} record(s) linked to {linked_id}")
+        return matches
+
+    def _scan_linked_records(self, table_name: str, link_field: str, fields: List[str]) -> Iterable[Dict]:
+        """Stream every record with a populated link field"""
+        return self.client.iter_records(table_name, f"COUNTA({{{link_field}}}) > 0", fields=fields)
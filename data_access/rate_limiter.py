@@ -0,0 +1,98 @@
+import time
+import random
+import threading
+from typing import Dict, Optional
+
+
+class RequestStats:
+    """Thread-safe counters describing how requests moved through the rate limiter"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0   # requests sent, including retries
+        self.queued = 0     # requests that had to wait for a token
+        self.throttled = 0  # 429 responses received
+        self.retried = 0    # requests re-sent after a 429, 5xx or connection error
+        self.failed = 0     # requests that exhausted their retries
+        self.wait_seconds = 0.0
+
+    def increment(self, name: str, amount: float = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "queued": self.queued,
+                "throttled": self.throttled,
+                "retried": self.retried,
+                "failed": self.failed,
+                "wait_seconds": round(self.wait_seconds, 3),
+            }
+
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by every thread that calls ``acquire``
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``. A
+    ``pause`` (e.g. after a 429) blocks all callers until it expires.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, stats: Optional[RequestStats] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.stats = stats or RequestStats()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    break
+                else:
+                    delay = (1 - self._tokens) / self.rate
+
+            waited += delay
+            time.sleep(delay)
+
+        if waited:
+            self.stats.increment("queued")
+            self.stats.increment("wait_seconds", waited)
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for ``seconds`` and drain the bucket"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for a 1-based retry attempt"""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(base_id: str, rate: float) -> TokenBucket:
+    """Return the limiter for a base; Airtable's quota is per base, so clients share it"""
+    with _limiters_lock:
+        limiter = _limiters.get(base_id)
+        if limiter is None:
+            limiter = TokenBucket(rate)
+            _limiters[base_id] = limiter
+        return limiter
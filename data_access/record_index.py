@@ -0,0 +1,294 @@
+import json
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from config.airtable_config import (
+    RECORD_INDEX_PATH,
+    TABLE_PERSONAL,
+    TABLE_EXPERIENCE,
+    TABLE_SALARY,
+    APPLICANTS_TABLE,
+    SHORTLISTED_TABLE
+)
+
+logger = logging.getLogger(__name__)
+
+# Child tables tracked by the index and the link field pointing at their parent record
+CHILD_LINK_FIELDS = {
+    TABLE_EXPERIENCE: "Personal Details",
+    TABLE_SALARY: "Personal Details",
+    SHORTLISTED_TABLE: "Applicants",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parents (
+    table_name TEXT NOT NULL,
+    applicant_id TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    created_time TEXT,
+    fields TEXT,
+    PRIMARY KEY (table_name, applicant_id)
+);
+CREATE TABLE IF NOT EXISTS children (
+    record_id TEXT PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    parent_record_id TEXT NOT NULL,
+    created_time TEXT,
+    fields TEXT
+);
+CREATE INDEX IF NOT EXISTS children_by_parent ON children (table_name, parent_record_id);
+CREATE TABLE IF NOT EXISTS synced_parents (
+    table_name TEXT NOT NULL,
+    parent_record_id TEXT NOT NULL,
+    PRIMARY KEY (table_name, parent_record_id)
+);
+"""
+
+
+class LinkedRecordIndex:
+    """Local SQLite index from ApplicantId to Airtable record IDs
+
+    Tracks the Personal Details and Applicants record for each ApplicantId and
+    the child rows (Work Experience, Salary Preferences, Shortlisted Leads)
+    linked to each parent record, so writes can target rows without a lookup
+    request. A parent's children are only trusted once they have been synced,
+    i.e. written by this process or seen in a full scan; ``synced_parents``
+    records that, which lets "no children" be told apart from "unknown".
+
+    Each entry also keeps the field values last written or read for its
+    record, so writes can be diffed locally instead of reading the record
+    first. Only fields the record was written or read with are known; a
+    known field that Airtable left out of the response is stored as None.
+    """
+
+    def __init__(self, path: str = RECORD_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        # Index files written before field values were kept lack the column
+        for table in ("parents", "children"):
+            columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if "fields" not in columns:
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN fields TEXT")
+
+    def get_parent(self, table_name: str, applicant_id: str) -> Optional[str]:
+        """Return the indexed Personal Details or Applicants record ID for an ApplicantId"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record_id FROM parents WHERE table_name = ? AND applicant_id = ?",
+                (table_name, str(applicant_id))
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_parent_record(self, table_name: str, applicant_id: str) -> Optional[Dict]:
+        """Return the indexed parent as a record whose ``fields`` hold its known field values"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record_id, created_time, fields FROM parents WHERE table_name = ? AND applicant_id = ?",
+                (table_name, str(applicant_id))
+            ).fetchone()
+        return _record(*row) if row else None
+
+    def set_parent(self, table_name: str, applicant_id: str, record: Dict, fields: Optional[Iterable[str]] = None):
+        """Remember the parent record an upsert or scan returned for an ApplicantId
+
+        ``fields`` names the fields the record was written or read with, so
+        any of them missing from it are known to be empty; without it only the
+        values present are remembered. Values of other fields known from
+        earlier calls are kept. If the indexed entry has a different record ID
+        or ``createdTime`` the parent was recreated in Airtable, so its known
+        values and the children indexed under the old record are dropped.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT record_id, created_time, fields FROM parents WHERE table_name = ? AND applicant_id = ?",
+                (table_name, str(applicant_id))
+            ).fetchone()
+            created_time = record.get("createdTime")
+            same = row is not None and row[0] == record["id"]
+            if row and (not same or (created_time and row[1] and row[1] != created_time)):
+                logger.info(f"Index entry for {table_name} applicant {applicant_id} is stale; "
+                            f"replacing {row[0]} with {record['id']}")
+                self._conn.execute("DELETE FROM children WHERE parent_record_id = ?", (row[0],))
+                self._conn.execute("DELETE FROM synced_parents WHERE parent_record_id = ?", (row[0],))
+                same = False
+            known = json.loads(row[2]) if same and row[2] else {}
+            known.update(_known_values(record, fields))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parents (table_name, applicant_id, record_id, created_time, fields) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (table_name, str(applicant_id), record["id"], created_time or (row[1] if same else None),
+                 json.dumps(known) if known else None)
+            )
+
+    def forget_parent(self, table_name: str, applicant_id: str):
+        """Drop a parent entry that Airtable no longer recognizes"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM parents WHERE table_name = ? AND applicant_id = ?",
+                (table_name, str(applicant_id))
+            )
+
+    def get_children(self, table_name: str, parent_record_id: str) -> Optional[List[str]]:
+        """Return indexed child record IDs, or None if this parent's children have never been synced"""
+        with self._lock:
+            synced = self._conn.execute(
+                "SELECT 1 FROM synced_parents WHERE table_name = ? AND parent_record_id = ?",
+                (table_name, parent_record_id)
+            ).fetchone()
+            if not synced:
+                return None
+            rows = self._conn.execute(
+                "SELECT record_id FROM children WHERE table_name = ? AND parent_record_id = ? ORDER BY created_time, rowid",
+                (table_name, parent_record_id)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_children_records(self, table_name: str, parent_record_id: str) -> Optional[List[Dict]]:
+        """Like ``get_children``, but as records whose ``fields`` hold their known field values"""
+        with self._lock:
+            synced = self._conn.execute(
+                "SELECT 1 FROM synced_parents WHERE table_name = ? AND parent_record_id = ?",
+                (table_name, parent_record_id)
+            ).fetchone()
+            if not synced:
+                return None
+            rows = self._conn.execute(
+                "SELECT record_id, created_time, fields FROM children WHERE table_name = ? AND parent_record_id = ? "
+                "ORDER BY created_time, rowid",
+                (table_name, parent_record_id)
+            ).fetchall()
+        return [_record(*row) for row in rows]
+
+    def replace_children(self, table_name: str, parent_record_id: str, records: Iterable[Dict],
+                         fields: Optional[Iterable[str]] = None):
+        """Record the complete set of child rows now linked to a parent, read or written with ``fields``"""
+        with self._lock, self._conn:
+            self._replace_children(table_name, parent_record_id, records, fields)
+
+    def forget_children(self, table_name: str, parent_record_id: str):
+        """Mark a parent's children as unknown so the next write looks them up again"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM children WHERE table_name = ? AND parent_record_id = ?",
+                (table_name, parent_record_id)
+            )
+            self._conn.execute(
+                "DELETE FROM synced_parents WHERE table_name = ? AND parent_record_id = ?",
+                (table_name, parent_record_id)
+            )
+
+    def sync_children(self, table_name: str, records: Iterable[Dict], parent_record_ids: Iterable[str],
+                      fields: Optional[Iterable[str]] = None):
+        """Replace the children of every parent in ``parent_record_ids`` from a full table scan
+
+        Parents with no rows in ``records`` are stored as having no children.
+        ``fields`` is the projection the scan read, as for ``set_parent``.
+        """
+        link_field = CHILD_LINK_FIELDS[table_name]
+        grouped = {parent_record_id: [] for parent_record_id in parent_record_ids}
+        for record in records:
+            for parent_record_id in record.get("fields", {}).get(link_field, []):
+                if parent_record_id in grouped:
+                    grouped[parent_record_id].append(record)
+
+        with self._lock, self._conn:
+            for parent_record_id, children in grouped.items():
+                self._replace_children(table_name, parent_record_id, children, fields)
+
+    def rebuild(self, client) -> Dict[str, int]:
+        """Rebuild the whole index from full scans of every table"""
+        counts = {}
+        with self._lock, self._conn:
+            for table_name in (TABLE_PERSONAL, APPLICANTS_TABLE):
+                self._conn.execute("DELETE FROM parents WHERE table_name = ?", (table_name,))
+                counts[table_name] = 0
+                for record in client.iter_records(table_name, fields=["ApplicantId"]):
+                    applicant_id = record.get("fields", {}).get("ApplicantId")
+                    if applicant_id is None:
+                        continue
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO parents (table_name, applicant_id, record_id, created_time) "
+                        "VALUES (?, ?, ?, ?)",
+                        (table_name, str(applicant_id), record["id"], record.get("createdTime"))
+                    )
+                    counts[table_name] += 1
+
+            self._conn.execute("DELETE FROM children")
+            self._conn.execute("DELETE FROM synced_parents")
+            parents = {
+                table_name: [row[0] for row in self._conn.execute(
+                    "SELECT record_id FROM parents WHERE table_name = ?", (table_name,)
+                )]
+                for table_name in (TABLE_PERSONAL, APPLICANTS_TABLE)
+            }
+            for table_name, link_field in CHILD_LINK_FIELDS.items():
+                parent_table = APPLICANTS_TABLE if link_field == "Applicants" else TABLE_PERSONAL
+                for parent_record_id in parents[parent_table]:
+                    self._mark_synced(table_name, parent_record_id)
+                counts[table_name] = 0
+                for record in client.iter_records(table_name, fields=[link_field]):
+                    for parent_record_id in record.get("fields", {}).get(link_field, []):
+                        self._insert_child(table_name, parent_record_id, record, None)
+                        self._mark_synced(table_name, parent_record_id)
+                    counts[table_name] += 1
+
+        logger.info(f"Rebuilt record index at {self.path}: {counts}")
+        return counts
+
+    def close(self):
+        self._conn.close()
+
+    def _replace_children(self, table_name: str, parent_record_id: str, records: Iterable[Dict],
+                          fields: Optional[Iterable[str]]):
+        self._conn.execute(
+            "DELETE FROM children WHERE table_name = ? AND parent_record_id = ?",
+            (table_name, parent_record_id)
+        )
+        fields = list(fields) if fields is not None else None
+        for record in records:
+            self._insert_child(table_name, parent_record_id, record, fields)
+        self._mark_synced(table_name, parent_record_id)
+
+    def _insert_child(self, table_name: str, parent_record_id: str, record: Dict, fields: Optional[List[str]]):
+        known = _known_values(record, fields)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO children (record_id, table_name, parent_record_id, created_time, fields) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (record["id"], table_name, parent_record_id, record.get("createdTime"), json.dumps(known) if known else None)
+        )
+
+    def _mark_synced(self, table_name: str, parent_record_id: str):
+        self._conn.execute(
+            "INSERT OR IGNORE INTO synced_parents (table_name, parent_record_id) VALUES (?, ?)",
+            (table_name, parent_record_id)
+        )
+
+
+def _known_values(record: Dict, fields: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """Field values a record vouches for; Airtable omits empty fields, so requested ones it left out are None"""
+    values = record.get("fields", {})
+    if fields is None:
+        return dict(values)
+    return {name: values.get(name) for name in fields}
+
+
+def _record(record_id: str, created_time: Optional[str], fields: Optional[str]) -> Dict:
+    return {"id": record_id, "createdTime": created_time, "fields": json.loads(fields) if fields else {}}
+
+
+_shared_index = None
+_shared_index_lock = threading.Lock()
+
+
+def get_shared_index() -> Optional[LinkedRecordIndex]:
+    """Return the process-wide index, or None when AIRTABLE_RECORD_INDEX is not configured"""
+    global _shared_index
+    if not RECORD_INDEX_PATH:
+        return None
+    with _shared_index_lock:
+        if _shared_index is None:
+            _shared_index = LinkedRecordIndex(RECORD_INDEX_PATH)
+        return _shared_index
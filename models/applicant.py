@@ -1,8 +1,8 @@
-from dataclasses import dataclass
-from typing import List, Optional
+from typing import Optional, Tuple
+from models.codec import model
 
 
-@dataclass
+@model
 class PersonalInfo:
     name: Optional[str] = None
     email: Optional[str] = None
@@ -10,7 +10,7 @@ class PersonalInfo:
     linkedin: Optional[str] = None
 
 
-@dataclass
+@model
 class WorkExperience:
     company: Optional[str] = None
     title: Optional[str] = None
@@ -19,7 +19,7 @@ class WorkExperience:
     technologies: Optional[str] = None
 
 
-@dataclass
+@model
 class SalaryPreferences:
     preferred_rate: Optional[int] = None
     minimum_rate: Optional[int] = None
@@ -27,8 +27,8 @@ class SalaryPreferences:
     availability: Optional[int] = None
 
 
-@dataclass
+@model
 class Applicant:
     personal: PersonalInfo
-    experience: List[WorkExperience]
+    experience: Tuple[WorkExperience, ...]
     salary: SalaryPreferences
@@ -0,0 +1,126 @@
+import dataclasses
+from typing import Any, Callable, Dict, Tuple, Type, TypeVar, get_type_hints
+
+T = TypeVar("T")
+
+
+def model(cls: Type[T]) -> Type[T]:
+    """Make ``cls`` a frozen dataclass with ``__slots__``
+
+    Same result as ``dataclass(frozen=True, slots=True)``, which needs Python
+    3.10: instances carry no per-object ``__dict__``, so batches of applicants
+    take far less memory, and they are hashable and safe to share between stages.
+    """
+    cls = dataclasses.dataclass(frozen=True)(cls)
+    names = tuple(field.name for field in dataclasses.fields(cls))
+    # Class-level defaults would clash with the slots; __init__ already holds them
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ("__dict__", "__weakref__")}
+    namespace["__slots__"] = names
+    # Frozen instances reject setattr, which default unpickling of slots relies on
+    namespace["__getstate__"] = lambda self: tuple(getattr(self, name) for name in names)
+    namespace["__setstate__"] = _setstate(names)
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    slotted.__qualname__ = cls.__qualname__
+    return slotted
+
+
+def _setstate(names: Tuple[str, ...]) -> Callable[[Any, Tuple], None]:
+    def __setstate__(self, state: Tuple):
+        for name, value in zip(names, state):
+            object.__setattr__(self, name, value)
+    return __setstate__
+
+
+# Generated functions per model class, filled on first use
+_encoders: Dict[type, Callable[[Any], Dict[str, Any]]] = {}
+_decoders: Dict[type, Callable[[Dict[str, Any]], Any]] = {}
+
+
+def to_dict(obj: Any) -> Dict[str, Any]:
+    """Plain dict of a model, recursing into nested models and sequences of models
+
+    Keys are the field names in declaration order, so ``json.dumps`` of the
+    result matches the hand-written structures it replaces.
+    """
+    encode = _encoders.get(type(obj))
+    if encode is None:
+        encode = codec(type(obj))[0]
+    return encode(obj)
+
+
+def from_dict(cls: Type[T], data: Dict[str, Any]) -> T:
+    """Build ``cls`` from a dict made by ``to_dict``; missing keys and None sections take the defaults"""
+    decode = _decoders.get(cls)
+    if decode is None:
+        decode = codec(cls)[1]
+    return decode(data)
+
+
+def codec(cls: type) -> Tuple[Callable[[Any], Dict[str, Any]], Callable[[Dict[str, Any]], Any]]:
+    """The (to_dict, from_dict) pair of a model class, compiled once and cached
+
+    Each pair is generated source, like the methods dataclasses writes:
+    ``to_dict`` is a single dict expression with nested models inlined, so
+    encoding an applicant costs the same as a hand-written literal.
+    """
+    if cls not in _encoders:
+        _encoders[cls], _decoders[cls] = _compile(cls)
+    return _encoders[cls], _decoders[cls]
+
+
+def _compile(cls: type):
+    env: Dict[str, Any] = {"cls": cls}
+    decoders = []
+    for field, kind, item in _fields(cls):
+        name = field.name
+        if kind == "model":
+            env[f"dec_{name}"] = codec(item)[1]
+            decoders.append(f"{name}=dec_{name}(data.get({name!r}) or {{}})")
+        elif kind == "models":
+            env[f"dec_{name}"] = codec(item)[1]
+            decoders.append(f"{name}=tuple(dec_{name}(item) for item in data.get({name!r}) or ())")
+        else:
+            env[f"dflt_{name}"] = None if field.default is dataclasses.MISSING else field.default
+            decoders.append(f"{name}=data.get({name!r}, dflt_{name})")
+
+    source = (
+        "def to_dict(obj):\n"
+        f"    return {_encoder(cls, 'obj', 0)}\n"
+        "def from_dict(data):\n"
+        f"    return cls({', '.join(decoders)})\n"
+    )
+    exec(source, env)
+    return env["to_dict"], env["from_dict"]
+
+
+def _encoder(cls: type, value: str, depth: int) -> str:
+    """One dict expression for ``value``, with nested models inlined rather than called"""
+    entries = []
+    for field, kind, item in _fields(cls):
+        attribute = f"{value}.{field.name}"
+        if kind == "model":
+            entries.append(f"{field.name!r}: {_encoder(item, attribute, depth + 1)}")
+        elif kind == "models":
+            element = f"item{depth}"
+            entries.append(f"{field.name!r}: [{_encoder(item, element, depth + 1)} for {element} in {attribute}]")
+        else:
+            entries.append(f"{field.name!r}: {attribute}")
+    return f"{{{', '.join(entries)}}}"
+
+
+def _fields(cls: type):
+    hints = get_type_hints(cls)
+    for field in dataclasses.fields(cls):
+        kind, item = _field_kind(hints[field.name])
+        yield field, kind, item
+
+
+def _field_kind(hint: Any) -> Tuple[str, Any]:
+    """Classify a field type as a nested model, a sequence of models, or a plain value"""
+    if dataclasses.is_dataclass(hint):
+        return "model", hint
+    args = getattr(hint, "__args__", None) or ()
+    if getattr(hint, "__origin__", None) in (list, tuple) and args and dataclasses.is_dataclass(args[0]):
+        return "models", args[0]
+    return "value", None
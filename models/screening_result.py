@@ -1,8 +1,8 @@
-from dataclasses import dataclass
-from typing import List, Optional
+from typing import Optional
+from models.codec import model
 
 
-@dataclass
+@model
 class ScreeningResult:
     is_shortlisted: bool
     reason: str
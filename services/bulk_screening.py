@@ -0,0 +1,281 @@
+from datetime import date
+from itertools import chain
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+from models.applicant import Applicant
+from services.experience_spans import Span, end_ordinal, merged_days, start_ordinal
+
+# Larger than any day ordinal, so per-applicant offsets never overlap
+SPAN_STRIDE = date.max.toordinal() + 1
+
+# Day ordinal standing for a missing or invalid date (real ordinals start at 1)
+NO_DATE = 0
+
+# Set to False to screen with the pure-Python fallback even when numpy is installed
+USE_NUMPY = True
+
+# numpy module once imported, False when it is not installed
+_np = None
+
+
+def numpy_module():
+    """numpy, or None when it is unavailable or disabled
+
+    numpy is optional and takes a noticeable share of CLI startup, so it is
+    imported on the first bulk screening instead of with this module.
+    """
+    global _np
+    if not USE_NUMPY:
+        return None
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:  # Optional: without numpy the same columns are screened in pure Python
+            _np = False
+    return _np or None
+
+
+class Coded:
+    """A column stored as integer ``codes`` into its distinct ``values``
+
+    Anything that depends only on a row's value (a rule's verdict on a
+    location, a formatted reason line) is computed once per distinct value and
+    spread over the rows by code. With numpy ``codes`` is an int64 array,
+    otherwise a list.
+    """
+
+    __slots__ = ("codes", "values")
+
+    def __init__(self, codes, values: List[Any]):
+        self.codes = codes
+        self.values = values
+
+    @classmethod
+    def of(cls, values: Iterable[Any], typed: bool = False) -> "Coded":
+        """Code ``values`` in order of first appearance
+
+        With ``typed`` equal values of different types (50 and 50.0) get
+        separate codes, so each keeps its own formatting.
+        """
+        values = list(values)
+        keys = list(zip(values, map(type, values))) if typed else values
+        index = dict.fromkeys(keys)
+        for code, key in enumerate(index):
+            index[key] = code
+        distinct = [key[0] for key in index] if typed else list(index)
+        np = numpy_module()
+        if np is None:
+            return cls(list(map(index.__getitem__, keys)), distinct)
+        return cls(np.fromiter(map(index.__getitem__, keys), dtype=np.int64, count=len(keys)), distinct)
+
+    @classmethod
+    def of_numbers(cls, numbers) -> "Coded":
+        """Code a numeric column (e.g. the output of ``total_days``)"""
+        np = numpy_module()
+        if np is None:
+            return cls.of(numbers)
+        values, codes = np.unique(numbers, return_inverse=True)
+        return cls(codes.reshape(-1), values.tolist())
+
+    @classmethod
+    def of_flags(cls, flags) -> "Coded":
+        """Code a boolean column as 0/1"""
+        np = numpy_module()
+        if np is None:
+            return cls([int(flag) for flag in flags], [False, True])
+        return cls(np.asarray(flags, dtype=np.int64), [False, True])
+
+    def map(self, func: Callable[[Any], Any]) -> List[Any]:
+        """``func`` of each distinct value, in code order"""
+        return [func(value) for value in self.values]
+
+    def where(self, predicate: Callable[[Any], bool]):
+        """Per row, whether ``predicate`` holds for its value, evaluated once per distinct value"""
+        matching = [code for code, value in enumerate(self.values) if predicate(value)]
+        np = numpy_module()
+        if np is None:
+            matching = set(matching)
+            return [code in matching for code in self.codes]
+        return np.isin(self.codes, matching)
+
+    def take(self, per_value: List[Any]):
+        """Spread one entry per distinct value over the rows"""
+        return take(per_value, self.codes)
+
+    def relabel(self, func: Callable[[Any], Any]) -> "Coded":
+        """The same codes over ``func`` of each distinct value"""
+        return Coded(self.codes, self.map(func))
+
+    def merged(self) -> "Coded":
+        """Give rows with equal values the same code, e.g. after ``relabel`` formatted many values alike"""
+        index = {}
+        remap = [index.setdefault(value, len(index)) for value in self.values]
+        if len(index) == len(self.values):
+            return self
+        np = numpy_module()
+        codes = [remap[code] for code in self.codes] if np is None else np.array(remap, dtype=np.int64)[self.codes]
+        return Coded(codes, list(index))
+
+
+def combine(columns: Sequence[Coded]) -> Coded:
+    """Code rows by the tuple of their values in ``columns``, one code per distinct tuple"""
+    np = numpy_module()
+    if np is None:
+        tuples = Coded.of(zip(*(column.codes for column in columns)))
+        return tuples.relabel(lambda codes: tuple(column.values[code] for column, code in zip(columns, codes)))
+
+    # Mixed-radix keys, re-coded whenever the radix would overflow int64
+    keys = np.zeros(len(columns[0].codes), dtype=np.int64)
+    radix = 1
+    for column in columns:
+        width = max(1, len(column.values))
+        if radix * width >= 2 ** 62:
+            _, keys = np.unique(keys, return_inverse=True)
+            radix = int(keys.max()) + 1 if len(keys) else 1
+        keys = keys * width + column.codes
+        radix *= width
+    _, first, codes = np.unique(keys, return_index=True, return_inverse=True)
+    values = list(zip(*(take(column.values, column.codes[first]) for column in columns)))
+    return Coded(codes.reshape(-1), values)
+
+
+def take(per_value: List[Any], codes) -> List[Any]:
+    """``per_value[code]`` for every code, as a list"""
+    np = numpy_module()
+    if np is None:
+        return [per_value[code] for code in codes]
+    table = np.empty(len(per_value), dtype=object)
+    table[:] = per_value
+    return table[codes].tolist()
+
+
+class ApplicantColumns:
+    """A batch of applicants laid out column by column for bulk screening
+
+    Rates, availabilities and locations are coded columns, one row per
+    applicant. Experience rows of every applicant are flattened into parallel
+    columns, with ``owner`` holding the index of the applicant each row
+    belongs to and ``companies`` coded. Rows with usable dates also become
+    spans (``span_owner``, ``span_starts``, ``span_ends`` as day ordinals),
+    parsed once per distinct date string with the same rules as
+    services.experience_spans. Reading the applicants' attributes is the only
+    per-row Python work; rules in services.rules_engine then screen the whole
+    batch with array operations when numpy is installed, and with plain lists
+    (same results, no vectorization) when it is not.
+    """
+
+    def __init__(self, applicants: Sequence[Applicant], today: Optional[date] = None):
+        today = today or date.today()
+        self.size = len(applicants)
+        self.preferred_rates = Coded.of(map(attrgetter("salary.preferred_rate"), applicants), typed=True)
+        self.availabilities = Coded.of(map(attrgetter("salary.availability"), applicants), typed=True)
+        self.locations = Coded.of(map(attrgetter("personal.location"), applicants))
+
+        experiences = list(map(attrgetter("experience"), applicants))
+        rows = list(chain.from_iterable(experiences))
+        self.companies = Coded.of(map(attrgetter("company"), rows))
+        # Distinct date strings are few, so each is parsed once per batch
+        starts = Coded.of(map(attrgetter("start"), rows))
+        start_days = starts.map(lambda value: start_ordinal(value) or NO_DATE)
+        ends = Coded.of(map(attrgetter("end"), rows))
+        end_days = ends.map(lambda value: end_ordinal(value, today) or NO_DATE)
+
+        np = numpy_module()
+        if np is None:
+            starts, ends = starts.take(start_days), ends.take(end_days)
+            self.owner = [i for i, experience in enumerate(experiences) for _ in experience]
+            spans = [
+                (owner, start, end) for owner, start, end in zip(self.owner, starts, ends)
+                if start != NO_DATE and end >= start
+            ]
+            self.span_owner = [owner for owner, _, _ in spans]
+            self.span_starts = [start for _, start, _ in spans]
+            self.span_ends = [end for _, _, end in spans]
+            self.unparsed_rows = len(rows) - len(spans)
+            return
+
+        counts = np.fromiter(map(len, experiences), dtype=np.int64, count=self.size)
+        self.owner = np.repeat(np.arange(self.size, dtype=np.int64), counts)
+        starts = np.array(start_days, dtype=np.int64)[starts.codes]
+        ends = np.array(end_days, dtype=np.int64)[ends.codes]
+        # Same rule as make_span: both dates usable and the end not before the start
+        usable = (starts != NO_DATE) & (ends >= starts)
+        self.span_owner = self.owner[usable]
+        self.span_starts = starts[usable]
+        self.span_ends = ends[usable]
+        self.unparsed_rows = len(rows) - len(self.span_owner)
+
+    def total_days(self):
+        """Per applicant, the days covered by its spans with overlaps merged, as merged_days computes"""
+        np = numpy_module()
+        if np is None:
+            spans_by_owner: Dict[int, List[Span]] = {}
+            for owner, start, end in zip(self.span_owner, self.span_starts, self.span_ends):
+                spans_by_owner.setdefault(owner, []).append((start, end))
+            totals = [0] * self.size
+            for owner, spans in spans_by_owner.items():
+                totals[owner] = merged_days(spans)
+            return totals
+
+        if not len(self.span_owner):
+            return np.zeros(self.size, dtype=np.int64)
+        # Offsetting each applicant's days by owner * stride lets one global sort and
+        # running maximum merge every applicant's spans without mixing applicants
+        owner = self.span_owner
+        offset = owner * SPAN_STRIDE
+        starts = self.span_starts + offset
+        ends = self.span_ends + offset
+        order = np.lexsort((ends, starts))
+        owner, starts, ends = owner[order], starts[order], ends[order]
+
+        # A span opens a new merged block when it starts after everything before it has ended
+        reach = np.maximum.accumulate(ends)
+        opens_block = np.empty(len(starts), dtype=bool)
+        opens_block[0] = True
+        opens_block[1:] = starts[1:] > reach[:-1]
+        first = np.flatnonzero(opens_block)
+        lengths = np.maximum.reduceat(ends, first) - starts[first]
+        return np.bincount(owner[first], weights=lengths, minlength=self.size).astype(np.int64)
+
+    def any_row(self, row_flags):
+        """Per applicant, whether any of its experience rows is flagged"""
+        np = numpy_module()
+        if np is not None:
+            flags = np.zeros(self.size, dtype=bool)
+            flags[self.owner[np.asarray(row_flags, dtype=bool)]] = True
+            return flags
+
+        flags = [False] * self.size
+        for owner, flagged in zip(self.owner, row_flags):
+            if flagged:
+                flags[owner] = True
+        return flags
+
+
+def at_least(values, limit: float):
+    np = numpy_module()
+    if np is not None:
+        return np.asarray(values, dtype=np.float64) >= limit
+    return [value >= limit for value in values]
+
+
+def both(left, right):
+    np = numpy_module()
+    if np is not None:
+        return np.logical_and(left, right)
+    return [a and b for a, b in zip(left, right)]
+
+
+def either(left, right):
+    np = numpy_module()
+    if np is not None:
+        return np.logical_or(left, right)
+    return [a or b for a, b in zip(left, right)]
+
+
+def divide(values, divisor: float):
+    np = numpy_module()
+    if np is not None:
+        return np.asarray(values) / divisor
+    return [value / divisor for value in values]
@@ -0,0 +1,146 @@
+import json
+import base64
+import hashlib
+from typing import Any, Dict, List, Sequence
+from config.airtable_config import COMPRESSED_FORMAT, CELL_LIMIT
+from telemetry.metrics import get_metrics
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library produces the same compact JSON, only slower
+    orjson = None
+
+# Encodings of the "Compressed JSON" cell
+LEGACY = "legacy"    # v1: indented JSON with full key names
+COMPACT = "compact"  # v2: minified JSON with short keys and positional sections
+MSGPACK = "msgpack"  # v2 structure packed with msgpack and base64-encoded
+FORMATS = (LEGACY, COMPACT, MSGPACK)
+
+VERSION = 2
+MSGPACK_PREFIX = f"m{VERSION}:"
+
+# Field order of each positional section in version 2. Pinned here rather than read
+# from the models, so adding a model field needs a new version instead of silently
+# shifting the positions of cells already stored
+PERSONAL_FIELDS = ("name", "email", "location", "linkedin")
+EXPERIENCE_FIELDS = ("company", "title", "start", "end", "technologies")
+SALARY_FIELDS = ("preferred_rate", "minimum_rate", "currency", "availability")
+
+
+class CompressedFormatError(ValueError):
+    """A compressed payload cannot be encoded or decoded"""
+
+
+def encode(compressed: Dict[str, Any], fmt: str = COMPRESSED_FORMAT) -> str:
+    """Serialize a compressed applicant (as built by models.codec.to_dict) for an Airtable cell"""
+    with get_metrics().timer("codec_seconds", operation="encode", format=fmt):
+        text = _encode(compressed, fmt)
+    if len(text) > CELL_LIMIT:
+        raise CompressedFormatError(
+            f"Compressed applicant is {len(text)} characters in the {fmt} format; Airtable cells hold {CELL_LIMIT}"
+        )
+    return text
+
+
+def _encode(compressed: Dict[str, Any], fmt: str) -> str:
+    if fmt == LEGACY:
+        text = json.dumps(compressed, indent=2)
+    elif fmt == COMPACT:
+        text = _dumps(_pack(compressed))
+    elif fmt == MSGPACK:
+        text = MSGPACK_PREFIX + base64.b64encode(_msgpack().packb(_pack(compressed))).decode("ascii")
+    else:
+        raise CompressedFormatError(f"Unknown compressed format '{fmt}'. Choose from: {', '.join(FORMATS)}")
+    return text
+
+
+def decode(text: str) -> Dict[str, Any]:
+    """Parse a cell written in any format back into the full-key structure
+
+    The format is detected from the payload itself, so cells written before
+    the compact encoding keep decoding after the default changes.
+    """
+    with get_metrics().timer("codec_seconds", operation="decode"):
+        return _decode(text)
+
+
+def _decode(text: str) -> Dict[str, Any]:
+    try:
+        if text.startswith(MSGPACK_PREFIX):
+            data = _msgpack().unpackb(base64.b64decode(text[len(MSGPACK_PREFIX):]))
+        else:
+            data = orjson.loads(text) if orjson else json.loads(text)
+    except ValueError as e:
+        raise CompressedFormatError(f"Compressed JSON cannot be parsed: {e}")
+
+    if not isinstance(data, dict):
+        raise CompressedFormatError("Compressed JSON must be an object")
+    version = data.get("v", 1)
+    if version == 1:
+        return data
+    if version == VERSION:
+        return _unpack(data)
+    raise CompressedFormatError(f"Unsupported compressed format version {version}")
+
+
+def content_hash(compressed: Dict[str, Any]) -> str:
+    """Fingerprint of a compressed applicant's content, independent of the cell format
+
+    Computed over canonical JSON (sorted keys, no whitespace), so it changes
+    only when a source value changes, not when COMPRESSED_FORMAT does.
+    """
+    canonical = json.dumps(compressed, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _pack(compressed: Dict[str, Any]) -> Dict[str, Any]:
+    personal = compressed.get("personal") or {}
+    salary = compressed.get("salary") or {}
+    return {
+        "v": VERSION,
+        "p": _row(personal, PERSONAL_FIELDS),
+        "e": [_row(exp, EXPERIENCE_FIELDS) for exp in compressed.get("experience") or ()],
+        "s": _row(salary, SALARY_FIELDS)
+    }
+
+
+def _row(section: Dict[str, Any], fields: Sequence[str]) -> List[Any]:
+    """Section values in field order, without trailing nulls"""
+    row = [section.get(field) for field in fields]
+    while row and row[-1] is None:
+        row.pop()
+    return row
+
+
+def _unpack(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "personal": _section(data.get("p") or (), PERSONAL_FIELDS),
+        "experience": [_section(row, EXPERIENCE_FIELDS) for row in data.get("e") or ()],
+        "salary": _section(data.get("s") or (), SALARY_FIELDS)
+    }
+
+
+def _section(row: Sequence[Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """Section dict from a positional row, restoring trimmed trailing nulls
+
+    Zips the row straight onto the pinned field tuple; only a row trimmed by
+    ``_row`` is padded, so the common full row is built without copying it.
+    """
+    section = dict(zip(fields, row))
+    if len(section) < len(fields):
+        section.update(dict.fromkeys(fields[len(section):]))
+    return section
+
+
+def _dumps(data: Dict[str, Any]) -> str:
+    if orjson:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise CompressedFormatError("The msgpack format needs the msgpack package: pip install msgpack")
+    return msgpack
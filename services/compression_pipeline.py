@@ -0,0 +1,192 @@
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+from config.airtable_config import MAX_WORKERS
+from config.llm_config import LLM_CONCURRENCY, LLM_BATCH_SIZE
+from models.applicant import Applicant
+from services.compression_service import CompressionService
+
+logger = logging.getLogger(__name__)
+
+# Applicants fetched per batched read in the fetch stage
+FETCH_BATCH_SIZE = 10
+
+
+class CompressionPipeline:
+    """Asyncio engine that overlaps Airtable reads, Gemini calls and Airtable writes
+
+    Applicants flow through three stages connected by bounded queues:
+
+        fetch (batched reads) -> analyze (screening + LLM) -> save (writes)
+
+    While one applicant is being written, the next is with the LLM and later
+    ones are being fetched. Airtable stages share ``airtable_concurrency``
+    threads and the LLM stage has its own ``llm_concurrency`` threads, so a
+    slow Gemini call never blocks Airtable I/O. When the LLM falls behind, the
+    full queues stop the fetch stage from reading further ahead. With
+    ``llm_batch_size`` above 1, each LLM worker packs whatever applicants are
+    waiting (up to that many) into a single prompt. Analyses postponed by the
+    ``defer`` policy for rejected applicants run after every applicant is saved.
+    Without explicit IDs, every applicant is read up front with one paginated
+    scan per source table, and the fetch stage only feeds them into the queue.
+    """
+
+    def __init__(self, service: Optional[CompressionService] = None,
+                 airtable_concurrency: int = MAX_WORKERS, llm_concurrency: int = LLM_CONCURRENCY,
+                 queue_size: Optional[int] = None, fetch_batch_size: int = FETCH_BATCH_SIZE,
+                 llm_batch_size: int = LLM_BATCH_SIZE):
+        self.service = service or CompressionService()
+        self.airtable_concurrency = max(1, airtable_concurrency)
+        self.llm_concurrency = max(1, llm_concurrency)
+        self.llm_batch_size = max(1, llm_batch_size)
+        self.queue_size = queue_size or 2 * self.llm_concurrency * self.llm_batch_size
+        self.fetch_batch_size = max(1, fetch_batch_size)
+
+    def run(self, applicant_ids: Optional[Iterable[str]] = None,
+            prefetched: Optional[Dict[str, Applicant]] = None) -> Dict[str, Any]:
+        """Compress applicants and return the same report as CompressionService.compress_applicants
+
+        With ``prefetched``, exactly those already-read applicants are
+        compressed and the fetch stage makes no Airtable requests. Explicit
+        ``applicant_ids`` are fetched in batched OR queries as the run goes.
+        """
+        return asyncio.run(self.run_async(applicant_ids, prefetched))
+
+    def run_changed(self) -> Dict[str, Any]:
+        """Compress only applicants whose source rows changed; the report adds ``unchanged``"""
+        changed, unchanged = self.service.find_changed()
+        report = self.run(prefetched=changed)
+        report["unchanged"] = unchanged
+        return report
+
+    async def run_async(self, applicant_ids: Optional[Iterable[str]] = None,
+                        prefetched: Optional[Dict[str, Applicant]] = None) -> Dict[str, Any]:
+        started = time.monotonic()
+        loop = asyncio.get_running_loop()
+        airtable_executor = ThreadPoolExecutor(self.airtable_concurrency, thread_name_prefix="pipeline-airtable")
+        llm_executor = ThreadPoolExecutor(self.llm_concurrency, thread_name_prefix="pipeline-llm")
+
+        results: List[Dict[str, Any]] = []
+        errors: Dict[str, str] = {}
+        deferred: List[Dict[str, Any]] = []
+
+        async def call(executor, func, *args):
+            return await loop.run_in_executor(executor, func, *args)
+
+        try:
+            if prefetched is None and applicant_ids is None:
+                # A few paginated scans read everyone; batched OR queries are only for explicit IDs
+                prefetched = await call(airtable_executor, self.service.fetch_all)
+            if prefetched is not None:
+                ids = list(prefetched)
+            else:
+                ids = list(dict.fromkeys(str(applicant_id) for applicant_id in applicant_ids))
+            logger.info(f"Pipeline compressing {len(ids)} applicant(s) with {self.airtable_concurrency} "
+                        f"Airtable and {self.llm_concurrency} LLM worker(s)")
+
+            batches: asyncio.Queue = asyncio.Queue()
+            for i in range(0, len(ids), self.fetch_batch_size):
+                batches.put_nowait(ids[i:i + self.fetch_batch_size])
+            to_analyze: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+            to_save: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+            async def fetch_worker():
+                while True:
+                    try:
+                        batch = batches.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    try:
+                        if prefetched is not None:
+                            applicants = prefetched
+                        else:
+                            applicants = await call(airtable_executor, self.service.fetch, batch)
+                    except Exception as e:
+                        logger.error(f"Error fetching applicants {batch}: {e}")
+                        errors.update({applicant_id: str(e) for applicant_id in batch})
+                        continue
+                    for applicant_id in batch:
+                        applicant = applicants.get(applicant_id)
+                        if applicant is None:
+                            errors[applicant_id] = f"No applicant found with ID {applicant_id}"
+                        else:
+                            await to_analyze.put((applicant_id, applicant))
+
+            async def analyze_worker():
+                finished = False
+                while not finished:
+                    item = await to_analyze.get()
+                    if item is None:
+                        return
+                    # Take whatever else is already waiting, up to the prompt batch size
+                    batch = [item]
+                    while len(batch) < self.llm_batch_size:
+                        try:
+                            item = to_analyze.get_nowait()
+                        except asyncio.QueueEmpty:
+                            break
+                        if item is None:
+                            finished = True
+                            break
+                        batch.append(item)
+
+                    try:
+                        if len(batch) == 1:
+                            analyzed = [await call(llm_executor, self.service.analyze, *batch[0])]
+                        else:
+                            analyzed = await call(llm_executor, self.service.analyze_batch, batch, self.llm_batch_size)
+                    except Exception as e:
+                        logger.error(f"Error analyzing applicants {[applicant_id for applicant_id, _ in batch]}: {e}")
+                        errors.update({applicant_id: str(e) for applicant_id, _ in batch})
+                        continue
+                    for result in analyzed:
+                        await to_save.put(result)
+
+            async def save_worker():
+                while True:
+                    result = await to_save.get()
+                    if result is None:
+                        return
+                    try:
+                        saved = await call(airtable_executor, self.service.save, result)
+                    except Exception as e:
+                        logger.error(f"Error saving applicant {result['applicant_id']}: {e}")
+                        errors[result["applicant_id"]] = str(e)
+                        continue
+                    results.append(saved)
+                    if saved["llm_deferred"]:
+                        deferred.append(saved)
+
+            async def complete_deferred(result):
+                try:
+                    completed = await call(llm_executor, self.service.analyze_deferred, result)
+                    await call(airtable_executor, self.service.save, completed)
+                except Exception as e:
+                    logger.error(f"Error completing deferred analysis for applicant {result['applicant_id']}: {e}")
+                    return
+                result.update(completed)
+
+            fetchers = [asyncio.ensure_future(fetch_worker()) for _ in range(self.airtable_concurrency)]
+            analyzers = [asyncio.ensure_future(analyze_worker()) for _ in range(self.llm_concurrency)]
+            savers = [asyncio.ensure_future(save_worker()) for _ in range(self.airtable_concurrency)]
+
+            # Drain stage by stage: each stage stops once its upstream is done and its queue is empty
+            await asyncio.gather(*fetchers)
+            for _ in analyzers:
+                await to_analyze.put(None)
+            await asyncio.gather(*analyzers)
+            for _ in savers:
+                await to_save.put(None)
+            await asyncio.gather(*savers)
+
+            # Low-priority work: the executors bound how many run at once
+            if deferred:
+                logger.info(f"Running {len(deferred)} deferred LLM analysis(es)")
+                await asyncio.gather(*(complete_deferred(result) for result in deferred))
+        finally:
+            airtable_executor.shutdown(wait=True)
+            llm_executor.shutdown(wait=True)
+
+        return self.service.build_report(results, errors, started)
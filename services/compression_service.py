@@ -1,60 +1,266 @@
-import json
-from typing import Dict, Any
+import time
+import logging
+import threading
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from data_access.applicant_repository import ApplicantRepository
+from services import compressed_format
 from services.screening_service import ScreeningService
-from services.llm_service import analyze_applicant
+from services.rules_engine import ScreeningDecision, get_rules_engine
+from services.llm_service import analyze_applicant, analyze_applicants, get_provider
+from services.llm_parser import missing_fields
 from models.applicant import Applicant
+from models.codec import to_dict
+from config.llm_config import LLM_PROVIDER, REJECTED_LLM_POLICY, REJECTED_LLM_MODEL
+from telemetry.metrics import get_metrics, staged
 
+logger = logging.getLogger(__name__)
+
+# LLM policies for applicants rejected by the screening rules
+ANALYZE = "analyze"
+SKIP = "skip"
+DEFER = "defer"
+CHEAP = "cheap"
+REJECTED_POLICIES = (ANALYZE, SKIP, DEFER, CHEAP)
+
+# Analysis recorded for rejected applicants whose LLM call was skipped or is still deferred
+NO_ANALYSIS = {"summary": None, "score": None, "issues": None, "follow_ups": None}
 
 class CompressionService:
     """Service for compressing applicant data and performing analysis"""
     
-    def __init__(self):
-        self.repository = ApplicantRepository()
+    def __init__(self, repository: Optional[ApplicantRepository] = None,
+                 rejected_policy: str = REJECTED_LLM_POLICY):
+        if rejected_policy not in REJECTED_POLICIES:
+            raise ValueError(f"Unknown rejected-applicant LLM policy '{rejected_policy}'. "
+                             f"Choose from: {', '.join(REJECTED_POLICIES)}")
+        self.repository = repository or ApplicantRepository()
+        self.rejected_policy = rejected_policy
+        self._rejected_counts = {"rejected": 0, "skipped": 0, "deferred": 0, "cheap_model": 0}
+        self._counts_lock = threading.Lock()
     
     def compress_applicant(self, applicant_id: str) -> Dict[str, Any]:
         """Compress applicant data into a single JSON structure"""
         # Get applicant data
-        applicant = self.repository.get_applicant(applicant_id)
+        with get_metrics().stage("fetch"):
+            applicant = self.repository.get_applicant(applicant_id)
         if not applicant:
             raise ValueError(f"No applicant found with ID {applicant_id}")
-        
-        # Build compressed JSON
-        compressed = {
-            "personal": {
-                "name": applicant.personal.name,
-                "email": applicant.personal.email,
-                "location": applicant.personal.location,
-                "linkedin": applicant.personal.linkedin
-            },
-            "experience": [
-                {
-                    "company": exp.company,
-                    "title": exp.title,
-                    "start": exp.start,
-                    "end": exp.end,
-                    "technologies": exp.technologies
-                }
-                for exp in applicant.experience
-            ],
-            "salary": {
-                "preferred_rate": applicant.salary.preferred_rate,
-                "minimum_rate": applicant.salary.minimum_rate,
-                "currency": applicant.salary.currency,
-                "availability": applicant.salary.availability
-            }
+
+        result = self.analyze(applicant_id, applicant)
+        if result["llm_deferred"]:
+            # Nothing else is queued, so the deferred analysis runs before the one save
+            result = self.analyze_deferred(result)
+        return self.save(result)
+
+    def compress_applicants(self, applicant_ids: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Compress many applicants from a single bulk scan of the source tables.
+
+        When ``applicant_ids`` is None every applicant in Personal Details is compressed
+        from full table scans; otherwise the IDs are read with batched OR queries.
+        Failures are collected per applicant so one bad record does not stop the run.
+        """
+        started = time.monotonic()
+        if applicant_ids is None:
+            requested = None
+            applicants = self.fetch_all()
+        else:
+            requested = list(dict.fromkeys(str(applicant_id) for applicant_id in applicant_ids))
+            applicants = self.fetch(requested)
+        return self._compress_fetched(requested, applicants, started)
+
+    def compress_changed(self) -> Dict[str, Any]:
+        """Compress only the applicants whose source rows changed since they were last compressed
+
+        Same report as ``compress_applicants``, plus ``unchanged``: the number
+        of applicants skipped without screening, LLM calls or writes.
+        """
+        started = time.monotonic()
+        changed, unchanged = self.find_changed()
+        report = self._compress_fetched(None, changed, started)
+        report["unchanged"] = unchanged
+        return report
+
+    @staged("find_changed")
+    def find_changed(self) -> Tuple[Dict[str, Applicant], int]:
+        """Applicants whose content hash differs from the one stored in Applicants, and how many match
+
+        Reads the three source tables and the stored hashes with one projected
+        scan each. Applicants never compressed, or compressed before hashes were
+        stored, count as changed.
+        """
+        applicants = self.repository.get_all_applicants()
+        stored = self.repository.get_content_hashes()
+        changed = {
+            applicant_id: applicant for applicant_id, applicant in applicants.items()
+            if compressed_format.content_hash(self._build_compressed(applicant)) != stored.get(applicant_id)
         }
-        
-        # Perform screening
-        is_shortlisted, reason = ScreeningService.get_shortlist_status(applicant)
-        shortlist_status = "Shortlisted" if is_shortlisted else "Rejected"
-        
-        # LLM Analysis
-        llm_result = analyze_applicant(compressed)
-        
-        llm_score = llm_result.get("score", None)
-        llm_summary = llm_result.get("summary", None)
-        llm_issues = llm_result.get("issues", None)
+        logger.info(f"{len(changed)} of {len(applicants)} applicant(s) changed since their last compression")
+        return changed, len(applicants) - len(changed)
+
+    @staged("fetch")
+    def fetch_all(self) -> Dict[str, Applicant]:
+        """Read every applicant with one paginated scan per source table"""
+        return self.repository.get_all_applicants()
+
+    @staged("fetch")
+    def fetch(self, applicant_ids: List[str]) -> Dict[str, Applicant]:
+        """Read applicants with batched queries; the pipeline's fetch stage calls this"""
+        return self.repository.get_applicants(applicant_ids)
+
+    def _compress_fetched(self, requested: Optional[List[str]], applicants: Dict[str, Applicant],
+                          started: float) -> Dict[str, Any]:
+        """Compress already-fetched applicants, in ``requested`` order when given"""
+        results = []
+        errors = {}
+        for applicant_id in requested if requested is not None else list(applicants):
+            applicant = applicants.get(applicant_id)
+            if applicant is None:
+                errors[applicant_id] = f"No applicant found with ID {applicant_id}"
+                continue
+            try:
+                results.append(self._compress(applicant_id, applicant))
+            except Exception as e:
+                logger.error(f"Error compressing applicant {applicant_id}: {e}")
+                errors[applicant_id] = str(e)
+
+        # Deferred analyses run once every applicant has been saved
+        for i, result in enumerate(results):
+            if result["llm_deferred"]:
+                try:
+                    results[i] = self.save(self.analyze_deferred(result))
+                except Exception as e:
+                    logger.error(f"Error completing deferred analysis for applicant {result['applicant_id']}: {e}")
+
+        return self.build_report(results, errors, started)
+
+    def build_report(self, results: List[Dict[str, Any]], errors: Dict[str, str], started: float) -> Dict[str, Any]:
+        """Run report shared by the sequential and pipelined bulk paths; ``started`` is a monotonic time"""
+        elapsed = time.monotonic() - started
+        processed = len(results) + len(errors)
+        return {
+            "results": results,
+            "errors": errors,
+            "total": processed,
+            "elapsed_seconds": elapsed,
+            "applicants_per_second": processed / elapsed if elapsed > 0 else 0.0,
+            "rejected_llm": self.rejected_llm_report(),
+            "rules": get_rules_engine().stats()
+        }
+
+    def _compress(self, applicant_id: str, applicant: Applicant) -> Dict[str, Any]:
+        """Screen, analyze and save an already-fetched applicant"""
+        return self.save(self.analyze(applicant_id, applicant))
+
+    @staged("analyze")
+    def analyze(self, applicant_id: str, applicant: Applicant) -> Dict[str, Any]:
+        """Build the compressed JSON, screen it and run the LLM analysis, without writing to Airtable"""
+        compressed = self._build_compressed(applicant)
+        decision = ScreeningService.screen(applicant)
+        if decision.is_shortlisted or self.rejected_policy == ANALYZE:
+            llm_result = analyze_applicant(compressed)
+        elif self.rejected_policy == CHEAP:
+            llm_result = analyze_applicant(compressed, self._cheap_provider())
+        else:
+            llm_result = NO_ANALYSIS
+        if not decision.is_shortlisted:
+            self._count_rejected()
+        return self._build_result(applicant_id, compressed, decision, llm_result)
+
+    @staged("analyze")
+    def analyze_batch(self, applicants: List[Tuple[str, Applicant]], batch_size: int) -> List[Dict[str, Any]]:
+        """Analyze several applicants, packing up to ``batch_size`` of them into each LLM prompt"""
+        compressed = {applicant_id: self._build_compressed(applicant) for applicant_id, applicant in applicants}
+        screening = dict(zip(
+            (applicant_id for applicant_id, _ in applicants),
+            ScreeningService.screen_decisions([applicant for _, applicant in applicants])
+        ))
+
+        # Rejected applicants are analyzed according to the policy, the rest as usual
+        full, cheap = {}, {}
+        for applicant_id, decision in screening.items():
+            if decision.is_shortlisted or self.rejected_policy == ANALYZE:
+                full[applicant_id] = compressed[applicant_id]
+            elif self.rejected_policy == CHEAP:
+                cheap[applicant_id] = compressed[applicant_id]
+            if not decision.is_shortlisted:
+                self._count_rejected()
+        llm_results = analyze_applicants(full, batch_size) if full else {}
+        if cheap:
+            llm_results.update(analyze_applicants(cheap, batch_size, self._cheap_provider()))
+
+        return [
+            self._build_result(applicant_id, compressed[applicant_id], screening[applicant_id],
+                               llm_results.get(applicant_id, NO_ANALYSIS))
+            for applicant_id, _ in applicants
+        ]
+
+    @staged("analyze_deferred")
+    def analyze_deferred(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the LLM analysis that the defer policy postponed for an already-saved applicant"""
+        llm_result = analyze_applicant(result["compressed_data"])
+        return {**result, **self._llm_fields(llm_result), "llm_deferred": False,
+                "content_hash": self._content_hash(result["compressed_data"], llm_result)}
+
+    def rejected_llm_report(self) -> Dict[str, Any]:
+        """How the rejected-applicant policy changed LLM usage so far"""
+        with self._counts_lock:
+            counts = dict(self._rejected_counts)
+        return {
+            "policy": self.rejected_policy,
+            **counts,
+            # Calls the primary model did not have to make
+            "llm_calls_saved": counts["skipped"] + counts["cheap_model"]
+        }
+
+    def _count_rejected(self):
+        key = {SKIP: "skipped", DEFER: "deferred", CHEAP: "cheap_model"}.get(self.rejected_policy)
+        with self._counts_lock:
+            self._rejected_counts["rejected"] += 1
+            if key:
+                self._rejected_counts[key] += 1
+
+    @staticmethod
+    def _cheap_provider():
+        # No hedge or fallbacks: they would back the cheap model with pricier ones
+        return get_provider(f"{LLM_PROVIDER.partition(':')[0]}:{REJECTED_LLM_MODEL}", hedge=False, fallbacks=False)
+
+    @staticmethod
+    def _build_compressed(applicant: Applicant) -> Dict[str, Any]:
+        """Build the compressed JSON structure for an applicant"""
+        return to_dict(applicant)
+
+    def _build_result(self, applicant_id: str, compressed: Dict[str, Any], decision: ScreeningDecision,
+                      llm_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine an applicant's screening outcome with its LLM analysis"""
+        return {
+            "applicant_id": applicant_id,
+            "compressed_data": compressed,
+            "content_hash": self._content_hash(compressed, llm_result),
+            "shortlist_status": "Shortlisted" if decision.is_shortlisted else "Rejected",
+            **self._llm_fields(llm_result),
+            "reason": decision.reason,
+            # Rules that rejected the applicant and per-rule screening time
+            "failed_rules": decision.failed_rules,
+            "rule_seconds": decision.rule_seconds,
+            # Set when the defer policy left the LLM fields for later
+            "llm_deferred": not decision.is_shortlisted and self.rejected_policy == DEFER
+        }
+
+    def _content_hash(self, compressed: Dict[str, Any], llm_result: Dict[str, Any]) -> Optional[str]:
+        """Hash to store with the result, or None while its analysis is deferred or incomplete
+
+        Without a stored hash the next compress-changed run picks the applicant
+        up again, so failed or postponed LLM calls are retried.
+        """
+        if llm_result is NO_ANALYSIS:
+            settled = self.rejected_policy == SKIP
+        else:
+            settled = not missing_fields(llm_result)
+        return compressed_format.content_hash(compressed) if settled else None
+
+    @staticmethod
+    def _llm_fields(llm_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Result fields taken from an LLM analysis"""
         llm_follow_ups = llm_result.get("follow_ups", None)
         
         # Format follow-ups
@@ -63,32 +269,33 @@ class CompressionService:
         else:
             formatted_followups = None
         
-        # Save to Airtable
-        compressed_json_str = json.dumps(compressed, indent=2)
+        return {
+            "llm_score": llm_result.get("score", None),
+            "llm_summary": llm_result.get("summary", None),
+            "llm_issues": llm_result.get("issues", None),
+            "llm_follow_ups": formatted_followups
+        }
+
+    @staged("save")
+    def save(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Write an analyzed applicant to Applicants, and to Shortlisted Leads if qualified"""
+        compressed_json_str = compressed_format.encode(result["compressed_data"])
         applicant_record = self.repository.save_compressed_applicant(
-            applicant_id, 
+            result["applicant_id"], 
             compressed_json_str, 
-            shortlist_status, 
-            llm_score, 
-            llm_summary, 
-            formatted_followups
+            result["shortlist_status"], 
+            result["llm_score"], 
+            result["llm_summary"], 
+            result["llm_follow_ups"],
+            result["content_hash"]
         )
         
         # Add to shortlisted leads if qualified
-        if is_shortlisted:
+        if result["shortlist_status"] == "Shortlisted":
             self.repository.save_shortlisted_lead(
                 applicant_record["id"], 
                 compressed_json_str, 
-                reason
+                result["reason"]
             )
         
-        return {
-            "applicant_id": applicant_id,
-            "compressed_data": compressed,
-            "shortlist_status": shortlist_status,
-            "llm_score": llm_score,
-            "llm_summary": llm_summary,
-            "llm_issues": llm_issues,
-            "llm_follow_ups": formatted_followups,
-            "reason": reason
-        }
+        return result
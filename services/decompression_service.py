@@ -1,76 +1,141 @@
-import json
+import os
+import time
 import logging
-from typing import Dict, Any
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 from data_access.applicant_repository import ApplicantRepository
-from models.applicant import PersonalInfo, WorkExperience, SalaryPreferences
+from models.applicant import Applicant
+from models.codec import from_dict
+from services import compressed_format
+from config.airtable_config import MAX_WORKERS, DECOMPRESS_PROCESSES
+from telemetry.metrics import get_metrics, staged
 
 logger = logging.getLogger(__name__)
 
+# Below this many cells, decoding inline is faster than starting worker processes
+PROCESS_POOL_MIN_CELLS = 2000
+
+
+def decode_applicant(compressed_json: Optional[str]) -> Applicant:
+    """Rebuild an Applicant from a "Compressed JSON" cell in any stored format"""
+    if not compressed_json:
+        raise ValueError("Compressed JSON field is empty.")
+    # Any stored format decodes here, including cells written before the compact encoding
+    data = compressed_format.decode(compressed_json)
+    # One generated codec rebuilds every section, with missing fields left as None
+    return from_dict(Applicant, data)
+
+
+def _decode_cell(compressed_json: Optional[str]) -> Tuple[Optional[Applicant], Optional[str]]:
+    """Process-pool entry point: the applicant, or the error message instead of raising"""
+    try:
+        return decode_applicant(compressed_json), None
+    except Exception as e:
+        return None, str(e)
+
 
 class DecompressionService:
     """Service for decompressing applicant data and rebuilding detailed records"""
-    
-    def __init__(self):
-        self.repository = ApplicantRepository()
-    
+
+    def __init__(self, repository: Optional[ApplicantRepository] = None):
+        self.repository = repository or ApplicantRepository()
+
     def decompress_applicant(self, applicant_id: str) -> Dict[str, Any]:
         """Decompress applicant data and rebuild detailed Airtable records"""
         logger.info(f"Decompressing applicant: {applicant_id}")
-        
+
         # Get compressed applicant data
-        applicant_record = self.repository.get_compressed_applicant(applicant_id)
+        with get_metrics().stage("read"):
+            applicant_record = self.repository.get_compressed_applicant(applicant_id)
         if not applicant_record:
             raise ValueError(f"No applicant found with ID {applicant_id}")
-        
-        fields = applicant_record["fields"]
-        compressed_json = fields.get("Compressed JSON")
-        if not compressed_json:
-            raise ValueError("Compressed JSON field is empty.")
-        
-        data = json.loads(compressed_json)
-        
-        personal_data = data.get("personal", {})
-        experience_data = data.get("experience", [])
-        salary_data = data.get("salary", {})
-        
-        # Step 1: Save Personal Details
-        personal_info = PersonalInfo(
-            name=personal_data.get("name"),
-            email=personal_data.get("email"),
-            location=personal_data.get("location"),
-            linkedin=personal_data.get("linkedin")
-        )
-        personal_record = self.repository.save_personal_info(applicant_id, personal_info)
+
+        with get_metrics().stage("decode"):
+            applicant = decode_applicant(applicant_record["fields"].get("Compressed JSON"))
+        return self._write(applicant_id, applicant)
+
+    def decompress_applicants(self, applicant_ids: Optional[Iterable[str]] = None,
+                              concurrency: int = MAX_WORKERS,
+                              processes: int = DECOMPRESS_PROCESSES) -> Dict[str, Any]:
+        """Decompress many applicants from one read of the Applicants table
+
+        When ``applicant_ids`` is None every Applicants row is read in one
+        paginated scan; otherwise the IDs are read with batched OR queries.
+        Cells are decoded in ``processes`` worker processes (0 means one per
+        CPU) and ``concurrency`` applicants are written at a time, so the
+        shared rate limiter rather than request latency sets the pace.
+        Failures are collected per applicant so one bad record does not stop the run.
+        """
+        started = time.monotonic()
+        with get_metrics().stage("read"):
+            cells = self.repository.get_compressed_applicants(applicant_ids)
+        errors: Dict[str, str] = {}
+        if applicant_ids is not None:
+            for applicant_id in dict.fromkeys(str(applicant_id) for applicant_id in applicant_ids):
+                if applicant_id not in cells:
+                    errors[applicant_id] = f"No applicant found with ID {applicant_id}"
+
+        applicants = {}
+        for applicant_id, (applicant, error) in zip(cells, self._decode_cells(list(cells.values()), processes)):
+            if error:
+                logger.error(f"Error decoding applicant {applicant_id}: {error}")
+                errors[applicant_id] = error
+            else:
+                applicants[applicant_id] = applicant
+
+        results = []
+
+        def write(item: Tuple[str, Applicant]):
+            applicant_id, applicant = item
+            try:
+                results.append(self._write(applicant_id, applicant))
+            except Exception as e:
+                logger.error(f"Error decompressing applicant {applicant_id}: {e}")
+                errors[applicant_id] = str(e)
+
+        with ThreadPoolExecutor(max(1, concurrency), thread_name_prefix="decompress") as executor:
+            list(executor.map(write, applicants.items()))
+
+        elapsed = time.monotonic() - started
+        processed = len(results) + len(errors)
+        return {
+            "results": results,
+            "errors": errors,
+            "total": processed,
+            "elapsed_seconds": elapsed,
+            "applicants_per_second": processed / elapsed if elapsed > 0 else 0.0
+        }
+
+    @staticmethod
+    @staged("decode")
+    def _decode_cells(cells: List[Optional[str]], processes: int) -> List[Tuple[Optional[Applicant], Optional[str]]]:
+        """Decode cells in input order, in worker processes when there are enough of them"""
+        processes = processes or os.cpu_count() or 1
+        if processes <= 1 or len(cells) < PROCESS_POOL_MIN_CELLS:
+            return [_decode_cell(cell) for cell in cells]
+        chunksize = max(1, len(cells) // (processes * 4))
+        with ProcessPoolExecutor(processes) as pool:
+            return list(pool.map(_decode_cell, cells, chunksize=chunksize))
+
+    @staged("write")
+    def _write(self, applicant_id: str, applicant: Applicant) -> Dict[str, Any]:
+        """Write a decoded applicant back to Personal Details and its linked tables"""
+        # Step 1: Save Personal Details; the children link to its record ID
+        personal_record = self.repository.save_personal_info(applicant_id, applicant.personal)
         personal_id = personal_record["id"]
-        
-        # Step 2: Save Work Experience
-        work_experience_list = [
-            WorkExperience(
-                company=exp.get("company"),
-                title=exp.get("title"),
-                start=exp.get("start"),
-                end=exp.get("end"),
-                technologies=exp.get("technologies")
-            )
-            for exp in experience_data
-        ]
-        self.repository.save_work_experience(personal_id, work_experience_list)
-        
-        # Step 3: Save Salary Preferences
-        salary_preferences = SalaryPreferences(
-            preferred_rate=salary_data.get("preferred_rate"),
-            minimum_rate=salary_data.get("minimum_rate"),
-            currency=salary_data.get("currency"),
-            availability=salary_data.get("availability")
+
+        # Step 2: Work Experience and Salary Preferences are independent, so they are written concurrently
+        self.repository.client.run_concurrently(
+            lambda: self.repository.save_work_experience(personal_id, applicant.experience),
+            lambda: self.repository.save_salary_preferences(personal_id, applicant.salary)
         )
-        self.repository.save_salary_preferences(personal_id, salary_preferences)
-        
+
         logger.info(f"Successfully decompressed and updated Airtable for Applicant ID: {applicant_id}")
-        
+
         return {
             "applicant_id": applicant_id,
             "personal_id": personal_id,
-            "personal": personal_info,
-            "experience": work_experience_list,
-            "salary": salary_preferences
+            "personal": applicant.personal,
+            "experience": applicant.experience,
+            "salary": applicant.salary
         }
@@ -0,0 +1,94 @@
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+from models.applicant import WorkExperience
+
+DATE_FORMAT = "%Y-%m-%d"
+
+# End values meaning the role is ongoing, compared case-insensitively
+PRESENT_MARKERS = frozenset(["", "present", "current", "now"])
+
+# Distinct date strings remembered by parse_date; real data repeats a few thousand at most
+DATE_CACHE_SIZE = 65536
+
+Span = Tuple[int, int]
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_date(value: str) -> Optional[date]:
+    """Parse a YYYY-MM-DD date, or None if it is not a valid date
+
+    ``date.fromisoformat`` handles well-formed values; the strptime fallback
+    keeps accepting unpadded forms such as 2020-1-5.
+    """
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value, DATE_FORMAT).date()
+    except ValueError:
+        return None
+
+
+def is_present(value: Optional[str]) -> bool:
+    """Whether an end date means the role is still ongoing"""
+    return value is None or (isinstance(value, str) and value.strip().lower() in PRESENT_MARKERS)
+
+
+def start_ordinal(start: Optional[str]) -> Optional[int]:
+    """Day ordinal of a role's start, or None when it is missing or invalid"""
+    if not isinstance(start, str):
+        return None
+    start_date = parse_date(start.strip())
+    return start_date.toordinal() if start_date else None
+
+
+def end_ordinal(end: Optional[str], today: date) -> Optional[int]:
+    """Day ordinal of a role's end, ``today`` for an ongoing role, or None when invalid"""
+    if is_present(end):
+        return today.toordinal()
+    if not isinstance(end, str):
+        return None
+    end_date = parse_date(end.strip())
+    return end_date.toordinal() if end_date else None
+
+
+def span_days(start: Optional[str], end: Optional[str], today: date) -> Optional[Span]:
+    """Day ordinals (start, end) of one role, or None if it cannot be used
+
+    A missing or "present" end counts as ``today``. Rows with a missing or
+    invalid start, an invalid end, or an end before the start are skipped.
+    """
+    return make_span(start_ordinal(start), end_ordinal(end, today))
+
+
+def make_span(start: Optional[int], end: Optional[int]) -> Optional[Span]:
+    """Pair parsed ordinals into a span, or None if either is missing or they are reversed"""
+    if start is None or end is None or end < start:
+        return None
+    return start, end
+
+
+def merged_days(spans: Iterable[Span]) -> int:
+    """Total days covered by the union of spans, so overlapping roles count once (O(n log n))"""
+    total = 0
+    current_start = current_end = None
+    for start, end in sorted(spans):
+        if current_end is not None and start <= current_end:
+            if end > current_end:
+                current_end = end
+            continue
+        if current_end is not None:
+            total += current_end - current_start
+        current_start, current_end = start, end
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def total_experience_years(experience: Iterable[WorkExperience], today: Optional[date] = None) -> float:
+    """Years of experience across all roles, with overlaps merged and open-ended roles running to today"""
+    today = today or date.today()
+    spans = [span for span in (span_days(exp.start, exp.end, today) for exp in experience) if span is not None]
+    return merged_days(spans) / 365
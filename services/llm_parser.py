@@ -0,0 +1,164 @@
+import ast
+import json
+import re
+from typing import Any, Dict, Iterable, List, Optional
+
+# Keys of a parsed analysis, matching the LLM fields of ScreeningResult
+ANALYSIS_FIELDS = ("summary", "score", "issues", "follow_ups")
+
+# Fields an analysis must have to be usable; "issues" may legitimately be empty
+REQUIRED_FIELDS = ("summary", "score", "follow_ups")
+
+FIELD_SCHEMAS = {
+    "summary": {"type": "STRING"},
+    "score": {"type": "INTEGER"},
+    "issues": {"type": "STRING"},
+    "follow_ups": {"type": "ARRAY", "items": {"type": "STRING"}},
+}
+
+# Labels accepted in the plain-text format, lower-cased
+TEXT_LABELS = {
+    "summary": "summary",
+    "score": "score",
+    "issues": "issues",
+    "follow-ups": "follow_ups",
+    "follow ups": "follow_ups",
+    "followups": "follow_ups",
+}
+
+SCORE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(?:\s*/\s*(\d+(?:\.\d+)?))?")
+CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def analysis_schema(fields: Iterable[str] = ANALYSIS_FIELDS) -> Dict[str, Any]:
+    """JSON response schema for an analysis restricted to ``fields``"""
+    fields = list(fields)
+    return {
+        "type": "OBJECT",
+        "properties": {field: FIELD_SCHEMAS[field] for field in fields},
+        "required": fields,
+    }
+
+
+def batch_analysis_schema() -> Dict[str, Any]:
+    """JSON response schema for a batched prompt: one analysis per applicant ID"""
+    item = analysis_schema()
+    item["properties"] = {"applicant_id": {"type": "STRING"}, **item["properties"]}
+    item["required"] = ["applicant_id"] + item["required"]
+    return {"type": "ARRAY", "items": item}
+
+
+def parse_score(value: Any) -> Optional[int]:
+    """Normalize 8, "8", "8.0", "8/10" or "4/5" to an integer from 1 to 10, or None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        score = float(value)
+    elif isinstance(value, str):
+        match = SCORE_PATTERN.search(value)
+        if not match:
+            return None
+        score = float(match.group(1))
+        if match.group(2):
+            denominator = float(match.group(2))
+            if not denominator:
+                return None
+            score = score * 10 / denominator
+    else:
+        return None
+    score = int(round(score))
+    return score if 1 <= score <= 10 else None
+
+
+def parse_follow_ups(value: Any) -> Optional[str]:
+    """Return follow-up questions one per line, from a list or a "[q1, q2]" string"""
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith("["):
+            try:
+                parsed = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                # Unquoted lists such as [question1, question2] are kept as written
+                parsed = value
+            value = parsed
+    if isinstance(value, (list, tuple)):
+        value = "\n".join(str(question).strip() for question in value if str(question).strip())
+    return (value or None) if isinstance(value, str) else None
+
+
+def parse_issues(value: Any) -> Optional[str]:
+    if isinstance(value, (list, tuple)):
+        value = ", ".join(str(issue).strip() for issue in value if str(issue).strip()) or "None"
+    return (value.strip() or None) if isinstance(value, str) else None
+
+
+def normalize_analysis(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Coerce raw field values from either response format into a clean analysis dict"""
+    summary = data.get("summary")
+    return {
+        "summary": (summary.strip() or None) if isinstance(summary, str) else None,
+        "score": parse_score(data.get("score")),
+        "issues": parse_issues(data.get("issues")),
+        "follow_ups": parse_follow_ups(data.get("follow_ups")),
+    }
+
+
+def missing_fields(analysis: Dict[str, Any]) -> List[str]:
+    """Required fields that are absent or could not be parsed"""
+    return [field for field in REQUIRED_FIELDS if analysis.get(field) is None]
+
+
+def load_json(text: str) -> Any:
+    """Decode a JSON response, tolerating a surrounding Markdown code fence; None if it is not JSON"""
+    text = CODE_FENCE.sub("", text.strip())
+    if not text.startswith(("{", "[")):
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def parse_response(text: str) -> Dict[str, Any]:
+    """Parse a single-applicant response in JSON or "Label: value" form in one pass"""
+    data = load_json(text)
+    if isinstance(data, dict):
+        return normalize_analysis(data)
+
+    fields = {}
+    for line in text.splitlines():
+        label, separator, value = line.strip().partition(":")
+        field = TEXT_LABELS.get(label.strip().lower())
+        if separator and field and field not in fields:
+            fields[field] = value.strip()
+    return normalize_analysis(fields)
+
+
+BATCH_BLOCK_HEADER = re.compile(r"^\s*=+\s*Applicant\s+(.+?)\s*=+\s*$", re.MULTILINE)
+
+
+def parse_batch_response(text: str, applicant_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Split a batched response into per-applicant results, dropping unknown, missing or incomplete entries
+
+    Accepts a JSON array of analyses carrying ``applicant_id`` or the
+    "=== Applicant <id> ===" text blocks.
+    """
+    expected = set(applicant_ids)
+    entries = []
+    data = load_json(text)
+    if isinstance(data, dict):
+        data = data.get("applicants")
+    if isinstance(data, list):
+        entries = [(str(item.get("applicant_id", "")).strip(), normalize_analysis(item))
+                   for item in data if isinstance(item, dict)]
+    else:
+        headers = list(BATCH_BLOCK_HEADER.finditer(text))
+        for i, header in enumerate(headers):
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+            entries.append((header.group(1).strip(), parse_response(text[header.end():end])))
+
+    results = {}
+    for applicant_id, analysis in entries:
+        if applicant_id in expected and applicant_id not in results and not missing_fields(analysis):
+            results[applicant_id] = analysis
+    return results
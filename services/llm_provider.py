@@ -0,0 +1,284 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Optional
+from config.llm_config import (
+    GEMINI_MODEL, LLM_PROVIDER, FAKE_LLM_LATENCY, LLM_CONCURRENCY, LLM_TIMEOUT, LLM_HEDGE_MODEL,
+    LLM_HEDGE_DELAY, LLM_HEDGE_PERCENTILE, LLM_FALLBACK_PROVIDERS
+)
+
+logger = logging.getLogger(__name__)
+
+# Recent primary latencies kept for the hedge percentile, and how many are needed before using it
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+class LLMConfigurationError(ValueError):
+    """The provider cannot be used at all (e.g. missing API key), so retrying is pointless"""
+
+
+class LLMTimeoutError(Exception):
+    """No provider answered before the call's deadline"""
+
+
+class LLMProvider(ABC):
+    """Minimal interface the LLM service needs: turn a prompt into response text
+
+    When ``response_schema`` is given the provider should return JSON matching it.
+    """
+
+    # Recorded alongside cached analyses so different models never share entries
+    model_name: str = ""
+
+    @abstractmethod
+    def generate(self, prompt: str, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        """Return the model's response text for ``prompt``"""
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini, with the SDK imported and configured on the first request"""
+
+    def __init__(self, model_name: str = GEMINI_MODEL, api_key: Optional[str] = None,
+                 timeout: float = LLM_TIMEOUT):
+        self.model_name = model_name
+        self.timeout = timeout
+        self._api_key = api_key
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _get_model(self):
+        with self._lock:
+            if self._model is None:
+                api_key = self._api_key or os.getenv("GEMINI_API_KEY")
+                if not api_key:
+                    raise LLMConfigurationError("GEMINI_API_KEY not found in environment variables.")
+
+                # Deferred so commands that never call the LLM do not pay for the SDK import
+                import google.generativeai as genai
+
+                genai.configure(api_key=api_key)
+                self._model = genai.GenerativeModel(self.model_name)
+            return self._model
+
+    def generate(self, prompt: str, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        generation_config = None
+        if response_schema is not None:
+            generation_config = {"response_mime_type": "application/json", "response_schema": response_schema}
+        # The SDK's own timeout frees the worker thread even if a router has stopped waiting
+        request_options = {"timeout": self.timeout} if self.timeout else None
+        return self._get_model().generate_content(
+            prompt, generation_config=generation_config, request_options=request_options
+        ).text
+
+
+class FakeProvider(LLMProvider):
+    """Offline stand-in for tests and benchmarks that answers in the expected format
+
+    The score is derived from a hash of the applicant JSON, so repeated runs are
+    deterministic. Batched prompts get one entry per applicant, as JSON when a
+    response schema is requested and as labelled text blocks otherwise.
+    """
+
+    BATCH_LABEL = re.compile(r"^Applicant (\S+) JSON:$", re.MULTILINE)
+
+    def __init__(self, model_name: str = "fake", latency: float = FAKE_LLM_LATENCY):
+        self.model_name = model_name
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        labels = list(self.BATCH_LABEL.finditer(prompt))
+        if not labels:
+            answer = self._answer(prompt)
+            if response_schema is None:
+                return self._as_text(answer)
+            # Only the requested keys, as a repair request would expect
+            return json.dumps({key: answer[key] for key in response_schema.get("properties", answer)})
+
+        answers = []
+        for i, label in enumerate(labels):
+            end = labels[i + 1].start() if i + 1 < len(labels) else len(prompt)
+            answers.append((label.group(1), self._answer(prompt[label.end():end])))
+        if response_schema is not None:
+            return json.dumps([{"applicant_id": applicant_id, **answer} for applicant_id, answer in answers])
+        return "\n\n".join(f"=== Applicant {applicant_id} ===\n{self._as_text(answer)}" for applicant_id, answer in answers)
+
+    @staticmethod
+    def _answer(profile: str) -> Dict[str, Any]:
+        score = int(hashlib.sha256(profile.encode("utf-8")).hexdigest(), 16) % 10 + 1
+        return {
+            "summary": "Offline analysis generated by the fake LLM provider.",
+            "score": score,
+            "issues": "None",
+            "follow_ups": ["Can you confirm your availability?"],
+        }
+
+    @staticmethod
+    def _as_text(answer: Dict[str, Any]) -> str:
+        return (
+            f"Summary: {answer['summary']}\n"
+            f"Score: {answer['score']}\n"
+            f"Issues: {answer['issues']}\n"
+            f"Follow-Ups: {answer['follow_ups']!r}"
+        )
+
+
+class RouterProvider(LLMProvider):
+    """Send each prompt to a primary provider under a deadline, with hedging and fallback
+
+    If the primary has not answered after the hedge delay (the observed p95
+    latency once enough calls have completed), the same prompt also goes to
+    ``hedge`` and whichever answer arrives first wins. If neither answers
+    before ``timeout``, or both fail, each provider in ``fallbacks`` is tried
+    in order with a fresh deadline.
+    """
+
+    def __init__(self, primary: LLMProvider, hedge: Optional[LLMProvider] = None,
+                 fallbacks: Iterable[LLMProvider] = (), timeout: float = LLM_TIMEOUT,
+                 hedge_delay: float = LLM_HEDGE_DELAY, hedge_percentile: float = LLM_HEDGE_PERCENTILE,
+                 max_workers: int = 4 * LLM_CONCURRENCY):
+        self.primary = primary
+        self.hedge = hedge
+        self.fallbacks = list(fallbacks)
+        self.timeout = timeout
+        self.hedge_delay = hedge_delay
+        self.hedge_percentile = hedge_percentile
+        # Answers may come from any configured model, so cached analyses are keyed by all of them
+        self.model_name = "|".join(provider.model_name for provider in [primary, hedge, *self.fallbacks] if provider)
+
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._counts = {"calls": 0, "hedged": 0, "hedge_wins": 0, "timeouts": 0, "fallbacks": 0}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max(2, max_workers), thread_name_prefix="llm-router")
+
+    def generate(self, prompt: str, response_schema: Optional[Dict[str, Any]] = None) -> str:
+        self._count("calls")
+        try:
+            return self._race(prompt, response_schema)
+        except LLMConfigurationError:
+            raise
+        except Exception as e:
+            if not self.fallbacks:
+                raise
+            error = e
+
+        for fallback in self.fallbacks:
+            self._count("fallbacks")
+            logger.warning(f"Falling back to {fallback.model_name} after: {error}")
+            future = self._executor.submit(fallback.generate, prompt, response_schema)
+            done, _ = wait([future], timeout=self.timeout)
+            if not done:
+                self._count("timeouts")
+                error = LLMTimeoutError(f"{fallback.model_name} did not answer within {self.timeout}s")
+                continue
+            try:
+                return future.result()
+            except Exception as e:
+                error = e
+        raise error
+
+    def _race(self, prompt: str, response_schema: Optional[Dict[str, Any]]) -> str:
+        """Call the primary, hedge it if it is slow or fails, and return the first answer before the deadline"""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        primary = self._executor.submit(self.primary.generate, prompt, response_schema)
+        primary.add_done_callback(lambda future: self._record_latency(future, time.monotonic() - started))
+        pending = {primary: self.primary}
+
+        if self.hedge is not None:
+            done, _ = wait([primary], timeout=min(self.hedge_delay_seconds(), self.timeout))
+            if not done or primary.exception() is not None:
+                self._count("hedged")
+                logger.info(f"Hedging slow {self.primary.model_name} call with {self.hedge.model_name}")
+                pending[self._executor.submit(self.hedge.generate, prompt, response_schema)] = self.hedge
+
+        error = None
+        while pending:
+            done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    text = future.result()
+                except LLMConfigurationError:
+                    raise
+                except Exception as e:
+                    error = e
+                    continue
+                if provider is not self.primary:
+                    self._count("hedge_wins")
+                return text
+
+        if pending or error is None:
+            self._count("timeouts")
+            raise LLMTimeoutError(f"No answer from {self.primary.model_name} within {self.timeout}s")
+        raise error
+
+    def hedge_delay_seconds(self) -> float:
+        """Current delay before hedging: the configured percentile of recent primary latencies"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return self.hedge_delay
+        return samples[min(len(samples) - 1, int(len(samples) * self.hedge_percentile / 100))]
+
+    def _record_latency(self, future, elapsed: float):
+        if not future.cancelled() and future.exception() is None:
+            with self._lock:
+                self._latencies.append(elapsed)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counts)
+        stats["hedge_delay_seconds"] = round(self.hedge_delay_seconds(), 3)
+        return stats
+
+
+PROVIDERS = {
+    "gemini": GeminiProvider,
+    "fake": FakeProvider,
+}
+
+
+def build_provider(spec: str) -> LLMProvider:
+    """Build one provider from "name" or "name:model", e.g. "gemini:gemini-2.5-flash" """
+    name, _, model_name = spec.strip().partition(":")
+    try:
+        provider_class = PROVIDERS[name.strip().lower()]
+    except KeyError:
+        raise LLMConfigurationError(f"Unknown LLM provider '{name}'. Choose from: {', '.join(PROVIDERS)}")
+    return provider_class(model_name.strip()) if model_name.strip() else provider_class()
+
+
+def create_provider(spec: str = LLM_PROVIDER, hedge: bool = True, fallbacks: bool = True) -> LLMProvider:
+    """Build the configured provider stack: ``spec`` as primary, routed with hedging and fallbacks
+
+    Pass ``hedge=False`` and ``fallbacks=False`` for a model that must not be
+    backed up by other, possibly more expensive, models; the call deadline still applies.
+    """
+    primary = build_provider(spec)
+    hedge_provider = None
+    if hedge and LLM_HEDGE_MODEL and LLM_HEDGE_MODEL != primary.model_name:
+        hedge_provider = build_provider(f"{spec.partition(':')[0]}:{LLM_HEDGE_MODEL}")
+    fallback_providers = []
+    if fallbacks:
+        fallback_providers = [build_provider(entry) for entry in LLM_FALLBACK_PROVIDERS.split(",") if entry.strip()]
+    return RouterProvider(primary, hedge_provider, fallback_providers)
@@ -1,31 +1,96 @@
-import os
 import time
 import json
 import logging
-from dotenv import load_dotenv
-import google.generativeai as genai
-import ast
+import threading
+from typing import Dict, List, Optional
+from config.llm_config import LLM_CACHE_ENABLED, LLM_BATCH_SIZE, LLM_STRUCTURED_OUTPUT
+from services.llm_cache import LLMCache, cache_key
+from data_access.rate_limiter import backoff_delay
+from services.llm_provider import LLMProvider, LLMConfigurationError, create_provider
+from services.llm_parser import (
+    analysis_schema, batch_analysis_schema, missing_fields, parse_batch_response, parse_response
+)
+from telemetry.metrics import get_metrics
 
-load_dotenv()
-
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("llm_service")
 
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY not found in environment variables.")
-
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel("gemini-2.5-pro")
-
 MAX_RETRIES = 3
 RETRY_BACKOFF_BASE = 2
+RETRY_BACKOFF_MAX = 30
+
+# Shared providers keyed by spec; None is the configured LLM_PROVIDER
+_providers: Dict[Optional[str], LLMProvider] = {}
+_provider_lock = threading.Lock()
+
+# Instructions used in prompts, keyed by analysis field
+FIELD_INSTRUCTIONS = {
+    "summary": "a concise 75-word summary",
+    "score": "overall candidate quality from 1-10 as an integer (higher is better)",
+    "issues": "any data gaps or inconsistencies you notice, as a comma-separated list or 'None'",
+    "follow_ups": "up to three follow-up questions to clarify gaps",
+}
+
+_cache = None
+_cache_enabled = LLM_CACHE_ENABLED
+_cache_lock = threading.Lock()
+
+
+def set_provider(provider: Optional[LLMProvider], spec: Optional[str] = None):
+    """Use ``provider`` wherever ``spec`` is requested (the default provider when None); None resets it"""
+    with _provider_lock:
+        if provider is None:
+            _providers.pop(spec, None)
+        else:
+            _providers[spec] = provider
 
 
-def build_prompt(applicant_json: dict) -> str:
+def get_provider(spec: Optional[str] = None, hedge: bool = True, fallbacks: bool = True) -> LLMProvider:
+    """Return the shared provider for ``spec`` ("name" or "name:model"), creating it on first use
+
+    ``hedge`` and ``fallbacks`` are passed to ``create_provider`` when the
+    provider is created; later calls for the same spec share that instance.
+    """
+    with _provider_lock:
+        if spec not in _providers:
+            if spec is None:
+                _providers[spec] = create_provider(hedge=hedge, fallbacks=fallbacks)
+            else:
+                _providers[spec] = create_provider(spec, hedge=hedge, fallbacks=fallbacks)
+        return _providers[spec]
+
+
+def set_cache_enabled(enabled: bool):
+    """Turn the persistent analysis cache on or off for this process (e.g. --no-llm-cache)"""
+    global _cache_enabled
+    _cache_enabled = enabled
+
+
+def get_cache() -> Optional[LLMCache]:
+    """Return the shared analysis cache, opening it on first use, or None when disabled"""
+    global _cache
+    if not _cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
+
+
+def build_prompt(applicant_json: dict, structured: bool = LLM_STRUCTURED_OUTPUT) -> str:
     """
     Construct the prompt string to send to Gemini based on the applicant JSON.
     """
+    if structured:
+        output_format = """Return a JSON object with exactly these keys:
+    "summary": <text>, "score": <integer>, "issues": <comma-separated list or 'None'>,
+    "follow_ups": [question1, question2, question3]"""
+    else:
+        output_format = """Return exactly:
+    Summary: <text>
+    Score: <integer>
+    Issues: <comma-separated list or 'None'>
+    Follow-Ups: [question1, question2, question3]"""
+
     return f"""
     You are a recruiting analyst. Given this JSON applicant profile, do four things:
     1. Provide a concise 75-word summary.
@@ -33,32 +98,99 @@ def build_prompt(applicant_json: dict) -> str:
     3. List any data gaps or inconsistencies you notice.
     4. Suggest up to three follow-up questions to clarify gaps(MUST)
 
-    Return exactly:
-    Summary: <text>
-    Score: <integer>
-    Issues: <comma-separated list or 'None'>
-    Follow-Ups: [question1, question2, question3]
+    {output_format}
 
     Applicant JSON:
     ```json
     {json.dumps(applicant_json, indent=2)}"""
 
 
-def analyze_applicant(applicant_json: dict) -> dict:
-    prompt = build_prompt(applicant_json)
+def build_repair_prompt(applicant_json: dict, partial: dict, missing: List[str]) -> str:
+    """
+    Construct a follow-up prompt that asks only for the fields missing from an earlier analysis.
+    """
+    known = {field: value for field, value in partial.items() if value is not None}
+    wanted = "\n".join(f"    - {field}: {FIELD_INSTRUCTIONS[field]}" for field in missing)
+    return f"""
+    You are a recruiting analyst. An earlier analysis of this JSON applicant profile was incomplete.
+    Return a JSON object with ONLY these keys:
+{wanted}
+
+    Earlier analysis:
+    {json.dumps(known)}
+
+    Applicant JSON:
+    ```json
+    {json.dumps(applicant_json, separators=(',', ':'))}"""
+
+
+def repair_analysis(provider: LLMProvider, applicant_json: dict, analysis: dict, missing: List[str]) -> dict:
+    """Fill in the fields a response left out with a small follow-up request instead of a full retry"""
+    logger.info(f"Analysis missing {', '.join(missing)}; asking {provider.model_name} for those fields only")
+    try:
+        with get_metrics().timer("llm_request_seconds", model=provider.model_name, kind="repair"):
+            text = provider.generate(build_repair_prompt(applicant_json, analysis, missing), analysis_schema(missing))
+        repaired = parse_response(text)
+    except LLMConfigurationError:
+        raise
+    except Exception as e:
+        logger.error(f"Gemini API error on repair request: {e}")
+        return analysis
+
+    merged = dict(analysis)
+    for field in missing:
+        if repaired[field] is not None:
+            merged[field] = repaired[field]
+    return merged
+
+
+def analyze_applicant(applicant_json: dict, provider: Optional[LLMProvider] = None) -> dict:
+    provider = provider or get_provider()
+    # Includes cache lookups, retries and repairs; llm_request_seconds times the model calls alone
+    with get_metrics().timer("llm_analyze_seconds", model=provider.model_name):
+        prompt = build_prompt(applicant_json)
+        key = cache_key(prompt, provider.model_name)
+        cached = _cached_analysis(key, provider)
+        if cached is not None:
+            return cached
+        return _request_analysis(applicant_json, provider, prompt, key)
+
 
+def _cached_analysis(key: str, provider: LLMProvider) -> Optional[dict]:
+    """Identical prompts to the same model reuse the stored analysis; None on a miss or with the cache off"""
+    cache = get_cache()
+    cached = cache.get(key) if cache else None
+    if cached is not None:
+        logger.info("Using cached Gemini analysis")
+        get_metrics().increment("llm_cache_hits_total", model=provider.model_name)
+    return cached
+
+
+def _request_analysis(applicant_json: dict, provider: LLMProvider, prompt: str, key: str) -> dict:
+    """Ask the model for one analysis after a cache miss, storing complete answers under ``key``"""
+    cache = get_cache()
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            logger.info(f"Sending prompt to Gemini (attempt {attempt})")
-            response = model.generate_content(prompt)
-            text = response.text.strip()
-            return parse_response(text)
+            logger.info(f"Sending prompt to {provider.model_name} (attempt {attempt})")
+            with get_metrics().timer("llm_request_seconds", model=provider.model_name, kind="single"):
+                text = provider.generate(prompt, analysis_schema() if LLM_STRUCTURED_OUTPUT else None)
+            result = parse_response(text)
 
+            # A parseable but incomplete answer is repaired, not re-sent in full
+            missing = missing_fields(result)
+            if missing:
+                result = repair_analysis(provider, applicant_json, result, missing)
+            if cache and not missing_fields(result):
+                cache.put(key, result)
+            return result
+
+        except LLMConfigurationError:
+            raise
         except Exception as e:
             logger.error(f"Gemini API error on attempt {attempt}: {e}")
             if attempt < MAX_RETRIES:
-                wait_time = RETRY_BACKOFF_BASE ** attempt
-                logger.info(f"Retrying in {wait_time} seconds...")
+                wait_time = backoff_delay(attempt, RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX)
+                logger.info(f"Retrying in {wait_time:.1f} seconds...")
                 time.sleep(wait_time)
             else:
                 logger.error("Maximum retry attempts reached. Returning fallback values.")
@@ -70,38 +202,93 @@ def analyze_applicant(applicant_json: dict) -> dict:
                 }
 
 
-def parse_response(text: str) -> dict:
-    summary = extract_field(text, "Summary:")
-    score = extract_field(text, "Score:")
-    issues = extract_field(text, "Issues:")
-    follow_ups = extract_followups(text)
+def build_batch_prompt(applicants: Dict[str, dict], structured: bool = LLM_STRUCTURED_OUTPUT) -> str:
+    """
+    Construct one prompt that asks Gemini to analyze several applicants, each tagged with its ID.
+    """
+    profiles = "\n\n".join(
+        f"Applicant {applicant_id} JSON:\n```json\n{json.dumps(applicant_json, separators=(',', ':'))}\n```"
+        for applicant_id, applicant_json in applicants.items()
+    )
+    if structured:
+        output_format = """Return a JSON array with one object per applicant, in the same order, with exactly these keys:
+    "applicant_id": <id>, "summary": <text>, "score": <integer>, "issues": <comma-separated list or 'None'>,
+    "follow_ups": [question1, question2, question3]"""
+    else:
+        output_format = """Return one block per applicant, in the same order, exactly:
+    === Applicant <id> ===
+    Summary: <text>
+    Score: <integer>
+    Issues: <comma-separated list or 'None'>
+    Follow-Ups: [question1, question2, question3]"""
+
+    return f"""
+    You are a recruiting analyst. Below are {len(applicants)} JSON applicant profiles, each labelled with an
+    applicant ID. For EACH applicant, do four things:
+    1. Provide a concise 75-word summary.
+    2. Rate overall candidate quality from 1-10 (higher is better).
+    3. List any data gaps or inconsistencies you notice.
+    4. Suggest up to three follow-up questions to clarify gaps(MUST)
 
-    return {
-        "summary": summary,
-        "score": int(score) if score and score.isdigit() else None,
-        "issues": issues,
-        "follow_ups": follow_ups
-    }
+    {output_format}
 
+{profiles}"""
 
-def extract_field(text: str, label: str) -> str:
-    for line in text.splitlines():
-        if line.strip().startswith(label):
-            return line.split(":", 1)[1].strip()
-    return None
 
+def analyze_applicants(applicants: Dict[str, dict], batch_size: int = LLM_BATCH_SIZE,
+                       provider: Optional[LLMProvider] = None) -> Dict[str, dict]:
+    """Analyze many applicants, packing up to ``batch_size`` of them into each Gemini prompt
 
-def extract_followups(text: str) -> str:
-    for line in text.splitlines():
-        if line.strip().startswith("Follow-Ups:"):
-            raw = line.split(":", 1)[1].strip()
+    Cached analyses are reused per applicant. Any applicant missing from a
+    batched response, or whose entry could not be parsed, is retried on its
+    own. Each applicant's prompt is looked up in the cache once, so a retry
+    does not count a second miss.
+    """
+    provider = provider or get_provider()
+    cache = get_cache()
+    results = {}
+    pending = {}
+    # Single-applicant prompt and cache key of each pending applicant, for its retry and cache entry
+    prompts = {}
+    for applicant_id, applicant_json in applicants.items():
+        prompt = build_prompt(applicant_json)
+        key = cache_key(prompt, provider.model_name)
+        cached = _cached_analysis(key, provider)
+        if cached is not None:
+            results[applicant_id] = cached
+        else:
+            pending[applicant_id] = applicant_json
+            prompts[applicant_id] = (prompt, key)
+
+    def retry(applicant_id: str) -> dict:
+        with get_metrics().timer("llm_analyze_seconds", model=provider.model_name):
+            return _request_analysis(pending[applicant_id], provider, *prompts[applicant_id])
 
-            try:
-                parsed = ast.literal_eval(raw)
-                if isinstance(parsed, list):
-                    return "\n".join(parsed)
-            except Exception as e:
-                # Fall back to returning raw if parsing fails
-                return raw
+    if batch_size <= 1:
+        results.update({applicant_id: retry(applicant_id) for applicant_id in pending})
+        return results
+
+    pending_ids = list(pending)
+    for i in range(0, len(pending_ids), batch_size):
+        batch = {applicant_id: pending[applicant_id] for applicant_id in pending_ids[i:i + batch_size]}
+        logger.info(f"Sending batched prompt for {len(batch)} applicant(s) to {provider.model_name}")
+        try:
+            with get_metrics().timer("llm_request_seconds", model=provider.model_name, kind="batch"):
+                text = provider.generate(build_batch_prompt(batch), batch_analysis_schema() if LLM_STRUCTURED_OUTPUT else None)
+            parsed = parse_batch_response(text, batch)
+        except LLMConfigurationError:
+            raise
+        except Exception as e:
+            logger.error(f"Gemini API error on batched prompt: {e}")
+            parsed = {}
+
+        for applicant_id in batch:
+            if applicant_id in parsed:
+                results[applicant_id] = parsed[applicant_id]
+                if cache:
+                    cache.put(prompts[applicant_id][1], parsed[applicant_id])
+            else:
+                logger.warning(f"No usable batched result for applicant {applicant_id}; retrying individually")
+                results[applicant_id] = retry(applicant_id)
 
-    return None
+    return results
@@ -0,0 +1,327 @@
+import os
+import json
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from models.applicant import Applicant
+from config.business_rules import BUSINESS_RULES_PATH, RULES_RELOAD_INTERVAL
+from services.experience_spans import total_experience_years
+from services.bulk_screening import ApplicantColumns, Coded, at_least, both, combine, divide, either
+
+logger = logging.getLogger(__name__)
+
+
+class RuleError(ValueError):
+    """A rules definition could not be compiled"""
+
+
+@dataclass
+class ScreeningDecision:
+    """Outcome of screening one applicant against a rule set"""
+    is_shortlisted: bool
+    reason: str
+    # Names of the rules that rejected the applicant, in rule order
+    failed_rules: List[str] = field(default_factory=list)
+    # Seconds spent in each rule for this applicant (amortized for batches)
+    rule_seconds: Dict[str, float] = field(default_factory=dict)
+
+
+class Rule(ABC):
+    """A compiled screening rule
+
+    ``check`` screens one applicant and ``check_columns`` a whole batch; both
+    return whether the applicant passed and the reason line, and must agree.
+    ``check_columns`` returns the pass flags per applicant and the reason
+    lines as a Coded column, so each distinct line is formatted only once.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @abstractmethod
+    def check(self, applicant: Applicant) -> Tuple[bool, str]:
+        """Screen one applicant"""
+
+    @abstractmethod
+    def check_columns(self, columns: ApplicantColumns) -> Tuple[Sequence[bool], Coded]:
+        """Screen a batch, one outcome and reason line per applicant"""
+
+
+class ExperienceRule(Rule):
+    """Enough total years of experience, or any role at a Tier-1 company"""
+
+    def __init__(self, name: str, min_years: float, tier_1_companies: Sequence[str]):
+        super().__init__(name)
+        self.min_years = float(min_years)
+        self.tier_1_companies = frozenset(company.casefold() for company in tier_1_companies)
+
+    def is_tier1(self, company: Optional[str]) -> bool:
+        return isinstance(company, str) and company.casefold() in self.tier_1_companies
+
+    def check(self, applicant: Applicant) -> Tuple[bool, str]:
+        total_years = total_experience_years(applicant.experience)
+        has_tier1 = any(self.is_tier1(exp.company) for exp in applicant.experience)
+        return self._line(total_years >= self.min_years or has_tier1, total_years)
+
+    def check_columns(self, columns: ApplicantColumns) -> Tuple[Sequence[bool], Coded]:
+        days = columns.total_days()
+        has_tier1 = columns.any_row(columns.companies.where(self.is_tier1))
+        passed = either(at_least(divide(days, 365), self.min_years), has_tier1)
+        # The line depends only on the outcome and the whole number of days
+        outcomes = combine([Coded.of_flags(passed), Coded.of_numbers(days)])
+        return passed, outcomes.relabel(lambda outcome: self._line(outcome[0], outcome[1] / 365)[1])
+
+    @staticmethod
+    def _line(passed: bool, total_years: float) -> Tuple[bool, str]:
+        if passed:
+            return True, f"Experience: {round(total_years, 1)} years or Tier-1 company"
+        return False, f"Experience: Only {round(total_years, 1)} years and no Tier-1 company"
+
+
+class CompensationRule(Rule):
+    """Preferred hourly rate at or under a cap, with enough weekly availability"""
+
+    def __init__(self, name: str, max_rate: float, min_availability: float):
+        super().__init__(name)
+        self.max_rate = max_rate
+        self.min_availability = min_availability
+
+    def check(self, applicant: Applicant) -> Tuple[bool, str]:
+        rate = applicant.salary.preferred_rate or 999
+        availability = applicant.salary.availability or 0
+        return (rate <= self.max_rate and availability >= self.min_availability,
+                self._line((rate, availability)))
+
+    def check_columns(self, columns: ApplicantColumns) -> Tuple[Sequence[bool], Coded]:
+        # Same defaults as check: a missing or zero rate counts as 999
+        rates = columns.preferred_rates.relabel(lambda rate: rate or 999)
+        availabilities = columns.availabilities.relabel(lambda availability: availability or 0)
+        passed = both(rates.where(lambda rate: rate <= self.max_rate),
+                      availabilities.where(lambda availability: availability >= self.min_availability))
+        return passed, combine([rates, availabilities]).relabel(self._line)
+
+    @staticmethod
+    def _line(pair: Tuple[Any, Any]) -> str:
+        return f"Compensation: ${pair[0]}/hr, {pair[1]} hrs/week"
+
+
+class LocationRule(Rule):
+    """Located in one of the approved countries (case-insensitive)"""
+
+    def __init__(self, name: str, countries: Sequence[str]):
+        super().__init__(name)
+        self.countries = frozenset(country.casefold() for country in countries)
+
+    def _outcome(self, location: Optional[str]) -> Tuple[bool, str]:
+        location = location or ""
+        return location.casefold() in self.countries, f"Location: {location}"
+
+    def check(self, applicant: Applicant) -> Tuple[bool, str]:
+        return self._outcome(applicant.personal.location)
+
+    def check_columns(self, columns: ApplicantColumns) -> Tuple[Sequence[bool], Coded]:
+        passed = columns.locations.where(lambda location: self._outcome(location)[0])
+        return passed, columns.locations.relabel(lambda location: self._outcome(location)[1])
+
+
+RULE_TYPES = {
+    "experience": ExperienceRule,
+    "compensation": CompensationRule,
+    "location": LocationRule,
+}
+
+
+class RuleSet:
+    """An ordered list of compiled rules; an applicant is shortlisted when every rule passes"""
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+
+    @classmethod
+    def compile(cls, definition: Dict[str, Any]) -> "RuleSet":
+        """Compile a {"rules": [{"name", "type", ...parameters}]} definition"""
+        entries = definition.get("rules") if isinstance(definition, dict) else None
+        if not entries:
+            raise RuleError("Rules definition must contain a non-empty 'rules' list")
+
+        rules = []
+        for entry in entries:
+            entry = dict(entry)
+            rule_type = entry.pop("type", None)
+            name = entry.pop("name", rule_type)
+            if rule_type not in RULE_TYPES:
+                raise RuleError(f"Rule '{name}' has unknown type '{rule_type}'. Choose from: {', '.join(RULE_TYPES)}")
+            if any(rule.name == name for rule in rules):
+                raise RuleError(f"Duplicate rule name '{name}'")
+            try:
+                rules.append(RULE_TYPES[rule_type](name, **entry))
+            except TypeError as e:
+                raise RuleError(f"Invalid parameters for rule '{name}': {e}")
+        return cls(rules)
+
+    def evaluate(self, applicant: Applicant) -> ScreeningDecision:
+        lines = []
+        failed = []
+        seconds = {}
+        for rule in self.rules:
+            started = time.perf_counter()
+            passed, line = rule.check(applicant)
+            seconds[rule.name] = time.perf_counter() - started
+            lines.append(line)
+            if not passed:
+                failed.append(rule.name)
+        return ScreeningDecision(not failed, "\n".join(lines), failed, seconds)
+
+    def evaluate_batch(self, applicants: Sequence[Applicant]) -> List[ScreeningDecision]:
+        """Screen a batch with column-wise rule passes; same decisions as ``evaluate`` on each applicant
+
+        A decision is built once per distinct combination of rule outcomes and
+        reason lines, and applicants sharing one share the same (read-only)
+        ScreeningDecision object.
+        """
+        columns = ApplicantColumns(applicants)
+        if columns.unparsed_rows:
+            logger.debug(f"Skipped {columns.unparsed_rows} experience row(s) with missing or invalid dates")
+
+        outcomes = []
+        seconds = {}
+        for rule in self.rules:
+            started = time.perf_counter()
+            outcomes.append(rule.check_columns(columns))
+            seconds[rule.name] = (time.perf_counter() - started) / max(1, columns.size)
+
+        if not columns.size:
+            return []
+        if not self.rules:
+            return [ScreeningDecision(True, "", [], seconds) for _ in applicants]
+
+        # Every decision in the batch shares the same (read-only) timing dict
+        names = [rule.name for rule in self.rules]
+        outcomes = combine([Coded.of_flags(passed) for passed, _ in outcomes] + [lines.merged() for _, lines in outcomes])
+
+        def decide(outcome: Tuple) -> ScreeningDecision:
+            passes, lines = outcome[:len(names)], outcome[len(names):]
+            failed = [name for name, passed in zip(names, passes) if not passed]
+            return ScreeningDecision(not failed, "\n".join(lines), failed, seconds)
+
+        return outcomes.take(outcomes.map(decide))
+
+
+def load_rules(path: str) -> RuleSet:
+    """Read and compile a JSON rules file"""
+    with open(path) as f:
+        try:
+            definition = json.load(f)
+        except ValueError as e:
+            raise RuleError(f"Rules file {path} is not valid JSON: {e}")
+    return RuleSet.compile(definition)
+
+
+class RulesEngine:
+    """Compiled business rules that follow changes to the rules file
+
+    The file's modification time is checked at most every ``reload_interval``
+    seconds, and a changed file is recompiled and swapped in, so long-running
+    workers pick up new rules without a restart. If a changed file fails to
+    compile, the error is logged and the previous rules stay active. The
+    engine also counts, per rule, how often it ran, how often it rejected an
+    applicant and how long it took.
+    """
+
+    def __init__(self, path: str = BUSINESS_RULES_PATH, reload_interval: float = RULES_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._rules: Optional[RuleSet] = None
+        self._mtime = None
+        self._checked = time.monotonic()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._reload_if_changed()
+
+    @property
+    def rules(self) -> RuleSet:
+        if time.monotonic() - self._checked >= self.reload_interval:
+            with self._lock:
+                if time.monotonic() - self._checked >= self.reload_interval:
+                    self._checked = time.monotonic()
+                    self._reload_if_changed()
+        return self._rules
+
+    def _reload_if_changed(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError as e:
+            if self._rules is None:
+                raise
+            logger.warning(f"Cannot check business rules file {self.path}: {e}")
+            return
+        if mtime == self._mtime:
+            return
+
+        try:
+            rules = load_rules(self.path)
+        except (OSError, RuleError) as e:
+            if self._rules is None:
+                raise
+            # Remember the broken version so the error is logged once, not on every check
+            self._mtime = mtime
+            logger.error(f"Keeping previous business rules; {self.path} failed to load: {e}")
+            return
+        self._rules = rules
+        self._mtime = mtime
+        logger.info(f"Loaded {len(rules.rules)} business rule(s) from {self.path}")
+
+    def evaluate(self, applicant: Applicant) -> ScreeningDecision:
+        decision = self.rules.evaluate(applicant)
+        self._record(1, decision.rule_seconds, Counter(decision.failed_rules))
+        return decision
+
+    def evaluate_batch(self, applicants: Sequence[Applicant]) -> List[ScreeningDecision]:
+        decisions = self.rules.evaluate_batch(applicants)
+        if decisions:
+            # Batch decisions are shared between applicants with the same outcome, so count each object once
+            counts = Counter(map(id, decisions))
+            distinct = dict(zip(map(id, decisions), decisions))
+            fired = Counter()
+            for key, count in counts.items():
+                for name in distinct[key].failed_rules:
+                    fired[name] += count
+            self._record(len(decisions), decisions[0].rule_seconds, fired)
+        return decisions
+
+    def _record(self, count: int, rule_seconds: Dict[str, float], fired: Counter):
+        with self._lock:
+            for name, seconds in rule_seconds.items():
+                stats = self._stats.setdefault(name, {"evaluated": 0, "fired": 0, "seconds": 0.0})
+                stats["evaluated"] += count
+                stats["fired"] += fired[name]
+                stats["seconds"] += seconds * count
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per rule: applicants evaluated, applicants it rejected, and mean time per applicant"""
+        with self._lock:
+            return {
+                name: {
+                    "evaluated": int(stats["evaluated"]),
+                    "fired": int(stats["fired"]),
+                    "mean_microseconds": round(stats["seconds"] / stats["evaluated"] * 1e6, 2)
+                }
+                for name, stats in self._stats.items()
+            }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_rules_engine() -> RulesEngine:
+    """Return the process-wide rules engine, loading BUSINESS_RULES_PATH on first use"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = RulesEngine()
+        return _engine
@@ -0,0 +1,271 @@
+import json
+import time
+import logging
+import functools
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+from config.telemetry_config import METRICS_ENABLED, METRICS_OTEL
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R")
+
+# Formats accepted by Metrics.export
+JSON = "json"
+PROMETHEUS = "prometheus"
+EXPORT_FORMATS = (JSON, PROMETHEUS)
+
+# Stage of the run the current thread is working on; added as a tag to everything it records
+_stage: ContextVar[Optional[str]] = ContextVar("metrics_stage", default=None)
+
+
+def current_stage() -> Optional[str]:
+    """Stage set by the innermost ``Metrics.stage`` block on this thread, if any"""
+    return _stage.get()
+
+
+def in_stage(stage: Optional[str], func: Callable[..., R], *args) -> R:
+    """Call ``func`` with ``stage`` as the current stage, e.g. in a worker thread started from that stage"""
+    token = _stage.set(stage)
+    try:
+        return func(*args)
+    finally:
+        _stage.reset(token)
+
+
+def staged(name: str):
+    """Decorator running every call of the function as stage ``name`` (see ``Metrics.stage``)"""
+    def decorate(func: Callable[..., R]) -> Callable[..., R]:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_metrics().stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class TimerStats:
+    """Running count, sum and maximum of one timer series"""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+
+class Timer:
+    """Context manager recording the elapsed time of its block, and an OpenTelemetry span when enabled"""
+
+    __slots__ = ("metrics", "name", "tags", "started", "span")
+
+    def __init__(self, metrics: "Metrics", name: str, tags: Dict[str, Any]):
+        self.metrics = metrics
+        self.name = name
+        self.tags = tags
+        self.span = None
+
+    def __enter__(self) -> "Timer":
+        tracer = self.metrics.tracer
+        if tracer is not None:
+            self.span = tracer.start_as_current_span(self.name, attributes={k: str(v) for k, v in self.tags.items()})
+            self.span.__enter__()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics._add_timing(self.name, self.tags, time.perf_counter() - self.started)
+        if self.span is not None:
+            self.span.__exit__(exc_type, exc, tb)
+        return False
+
+
+class _NullTimer:
+    """Stand-in returned while metrics are disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class _Stage:
+    """Sets the current stage for its block and times the block under ``stage_seconds``"""
+
+    __slots__ = ("timer", "name", "token")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self.name = name
+        self.timer = metrics.timer("stage_seconds", stage=name)
+
+    def __enter__(self):
+        self.token = _stage.set(self.name)
+        self.timer.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.timer.__exit__(exc_type, exc, tb)
+        _stage.reset(self.token)
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """Thread-safe, in-process timers and counters keyed by name and tags
+
+    Every series is identified by a metric name plus tags such as ``table``,
+    ``operation`` or ``stage``; the current stage (see ``stage``) is added to
+    anything recorded inside it. Timers keep a count, sum and maximum instead
+    of samples, so memory grows with the number of series, not of calls.
+    Stage totals add up time across threads, so with concurrent workers they
+    can exceed the wall-clock duration of the run. Work done in child
+    processes (e.g. the process-pool decode) is not recorded.
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED, otel: bool = METRICS_OTEL):
+        self.enabled = enabled
+        self.tracer = _otel_tracer() if enabled and otel else None
+        self._lock = threading.Lock()
+        self._timers: Dict[Tuple[str, Tuple], TimerStats] = {}
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._started = time.monotonic()
+
+    def timer(self, name: str, **tags):
+        """Context manager timing its block into the ``name`` series"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return Timer(self, name, tags)
+
+    def stage(self, name: str):
+        """Context manager marking its block as ``name``: timed, and the stage tag of nested metrics"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Stage(self, name)
+
+    def observe(self, name: str, seconds: float, **tags):
+        """Record one duration measured elsewhere"""
+        if self.enabled:
+            self._add_timing(name, tags, seconds)
+
+    def _add_timing(self, name: str, tags: Dict[str, Any], seconds: float):
+        key = self._key(name, tags)
+        with self._lock:
+            stats = self._timers.get(key)
+            if stats is None:
+                stats = self._timers[key] = TimerStats()
+            stats.add(seconds)
+
+    def increment(self, name: str, amount: float = 1, **tags):
+        """Add ``amount`` to a counter"""
+        if not self.enabled:
+            return
+        key = self._key(name, tags)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @staticmethod
+    def _key(name: str, tags: Dict[str, Any]) -> Tuple[str, Tuple]:
+        stage = _stage.get()
+        if stage is not None and "stage" not in tags:
+            tags["stage"] = stage
+        return name, tuple(sorted(tags.items()))
+
+    def reset(self):
+        """Drop every series and restart the run clock"""
+        with self._lock:
+            self._timers.clear()
+            self._counters.clear()
+            self._started = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Every series as plain data, grouped by metric name"""
+        with self._lock:
+            timers = {key: (stats.count, stats.total, stats.max) for key, stats in self._timers.items()}
+            counters = dict(self._counters)
+            elapsed = time.monotonic() - self._started
+
+        snapshot = {"elapsed_seconds": round(elapsed, 6), "timers": {}, "counters": {}}
+        for (name, tags), (count, total, maximum) in sorted(timers.items(), key=_series_order):
+            snapshot["timers"].setdefault(name, []).append({
+                "tags": _tag_dict(tags),
+                "count": count,
+                "total_seconds": round(total, 6),
+                "mean_seconds": round(total / count, 6) if count else 0.0,
+                "max_seconds": round(maximum, 6)
+            })
+        for (name, tags), value in sorted(counters.items(), key=_series_order):
+            snapshot["counters"].setdefault(name, []).append({"tags": _tag_dict(tags), "value": value})
+        return snapshot
+
+    def export(self, fmt: str = JSON) -> str:
+        """Render the snapshot as indented JSON or Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        if fmt == JSON:
+            return json.dumps(snapshot, indent=2)
+        if fmt != PROMETHEUS:
+            raise ValueError(f"Unknown metrics format '{fmt}'. Choose from: {', '.join(EXPORT_FORMATS)}")
+
+        lines = ["# TYPE run_elapsed_seconds gauge", f"run_elapsed_seconds {snapshot['elapsed_seconds']}"]
+        for name, series in snapshot["timers"].items():
+            lines.append(f"# TYPE {name} summary")
+            for entry in series:
+                labels = _labels(entry["tags"])
+                lines.append(f"{name}_count{labels} {entry['count']}")
+                lines.append(f"{name}_sum{labels} {entry['total_seconds']}")
+            lines.append(f"# TYPE {name}_max gauge")
+            lines.extend(f"{name}_max{_labels(entry['tags'])} {entry['max_seconds']}" for entry in series)
+        for name, series in snapshot["counters"].items():
+            lines.append(f"# TYPE {name} counter")
+            lines.extend(f"{name}{_labels(entry['tags'])} {entry['value']}" for entry in series)
+        return "\n".join(lines) + "\n"
+
+
+def _series_order(item) -> Tuple:
+    # Tag values may mix types (e.g. status 200 and "error"), so series sort on their text
+    (name, tags), _ = item
+    return name, [(tag, str(value)) for tag, value in tags]
+
+
+def _tag_dict(tags: Tuple) -> Dict[str, str]:
+    return {tag: str(value) for tag, value in tags}
+
+
+def _labels(tags: Dict[str, str]) -> str:
+    if not tags:
+        return ""
+    pairs = (
+        tag + '="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for tag, value in tags.items()
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+def _otel_tracer():
+    """The OpenTelemetry tracer for this service, or None when opentelemetry is not installed"""
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        logger.warning("METRICS_OTEL is set but opentelemetry is not installed: pip install opentelemetry-api")
+        return None
+    return trace.get_tracer("applicant_processing")
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics registry"""
+    return _metrics